@@ -0,0 +1,76 @@
+import threading
+import time
+
+
+# ================================================================
+# BACKGROUND DATA LOADING
+# ================================================================
+class LoadJob:
+    """
+    Runs a loader on a daemon thread so the script thread never blocks on I/O.
+
+    `loader` is called as loader(progress) and must return the loaded payload;
+    it reports through progress(rows, bytes_read, total_bytes). The payload is
+    only exposed once the thread has finished, so readers see either nothing or
+    the complete result – never a half-built frame. Keep the job in
+    st.session_state so it survives reruns and browser reconnects.
+    """
+
+    def __init__(self, loader, description="Loading data"):
+        self.loader = loader
+        self.description = description
+        self.rows = 0
+        self.bytes_read = None
+        self.total_bytes = None
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="supplysync-load", daemon=True)
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def _progress(self, rows, bytes_read=None, total_bytes=None):
+        with self._lock:
+            self.rows = rows
+            if bytes_read is not None:
+                self.bytes_read = bytes_read
+            if total_bytes is not None:
+                self.total_bytes = total_bytes
+
+    def _run(self):
+        try:
+            result = self.loader(self._progress)
+            error = None
+        except Exception as e:
+            result, error = None, e
+        with self._lock:
+            self.result, self.error = result, error
+            self.finished_at = time.time()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def done(self):
+        return self.started_at is not None and not self.running
+
+    def snapshot(self):
+        """Consistent copy of the progress counters for display"""
+        with self._lock:
+            elapsed = (self.finished_at or time.time()) - (self.started_at or time.time())
+            fraction = None
+            if self.total_bytes:
+                fraction = min((self.bytes_read or 0) / self.total_bytes, 1.0)
+            return {
+                "rows": self.rows,
+                "bytes_read": self.bytes_read,
+                "total_bytes": self.total_bytes,
+                "fraction": fraction,
+                "elapsed": elapsed,
+            }
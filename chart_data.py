@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# SERVER-SIDE CHART DATA PLANNING
+# ================================================================
+# Browser-rendered charts (Altair / Vega-Lite) receive their data inline, so
+# the payload has to be reduced on the server first: categories are
+# aggregated and folded into an "Other" bucket beyond the top N, ordered
+# axes (months, dates) are merged into consecutive ranges, distributions
+# become histograms and dense scatters become hexagonal bins. Every helper
+# returns at most max_points rows.
+MAX_POINTS = 5000
+OTHER_LABEL = "Other"
+
+
+class ChartPayloadError(ValueError):
+    """A chart would ship more rows to the browser than the configured maximum"""
+
+
+def check_payload(data, max_points=MAX_POINTS):
+    if data is not None and len(data) > max_points:
+        raise ChartPayloadError(
+            f"Chart data has {len(data):,} rows (limit {max_points:,}); aggregate it with chart_data first"
+        )
+    return data
+
+
+def _combine(sums, counts, agg):
+    if agg == "sum":
+        return sums
+    if agg == "mean":
+        return sums / counts.where(counts > 0)
+    raise ValueError(f"Unsupported aggregation {agg!r} (use 'sum' or 'mean')")
+
+
+def category_totals(df, by, value, agg="sum", top=None, ordered=False, max_points=MAX_POINTS,
+                    other=OTHER_LABEL):
+    """
+    Aggregate value per category of `by` (sum or mean) as a two-column frame.
+
+    Unordered categories are sorted by value; beyond `top` (or max_points)
+    the rest are folded into one `other` row whose mean is weighted by row
+    counts, so it is the true mean of those rows. Ordered categories (ordered=True,
+    e.g. months) keep their order and, when there are too many, consecutive
+    ones are merged into "first – last" ranges.
+    """
+    grouped = df.groupby(by, observed=True, sort=ordered)[value]
+    sums, counts = grouped.sum(), grouped.count()
+    limit = min(top or max_points, max_points)
+
+    if ordered:
+        if len(sums) > limit:
+            bucket = np.arange(len(sums)) * limit // len(sums)
+            labels = sums.index.astype(str)
+            first = pd.Series(labels, index=bucket).groupby(level=0).first()
+            last = pd.Series(labels, index=bucket).groupby(level=0).last()
+            sums = pd.Series(sums.to_numpy(), index=bucket).groupby(level=0).sum()
+            counts = pd.Series(counts.to_numpy(), index=bucket).groupby(level=0).sum()
+            names = np.where(first == last, first, first + " – " + last)
+            sums.index = counts.index = pd.Index(names, name=by)
+        result = _combine(sums, counts, agg)
+    else:
+        result = _combine(sums, counts, agg).sort_values(ascending=False)
+        if len(result) > limit:
+            keep = result.index[:limit - 1]
+            rest = ~sums.index.isin(keep)
+            tail = _combine(pd.Series([sums[rest].sum()]), pd.Series([counts[rest].sum()]), agg)
+            result = pd.concat([
+                result.iloc[:limit - 1].set_axis(result.index[:limit - 1].astype(str)),
+                pd.Series([tail.iloc[0]], index=[other]),
+            ])
+            result.index.name = by
+    return result.rename(value).reset_index()
+
+
+def histogram(values, bins=50, max_points=MAX_POINTS):
+    """Counts per equal-width bin: bin_start, bin_end, count"""
+    values = pd.Series(values).dropna().to_numpy(dtype=np.float64)
+    counts, edges = np.histogram(values, bins=min(bins, max_points)) if values.size else (np.array([]), np.array([0.0]))
+    return pd.DataFrame({"bin_start": edges[:-1], "bin_end": edges[1:], "count": counts})
+
+
+def hexbin(x, y, gridsize=40, max_points=MAX_POINTS):
+    """
+    Hexagonal 2-D bins of a scatter: x, y (hexagon centres) and count, for
+    non-empty cells only. gridsize is the number of hexagons across x.
+    """
+    x = pd.Series(x).to_numpy(dtype=np.float64, na_value=np.nan)
+    y = pd.Series(y).to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[keep], y[keep]
+    if not x.size:
+        return pd.DataFrame({"x": [], "y": [], "count": []})
+    gridsize = max(1, min(gridsize, int(np.sqrt(max_points))))
+    x_span = (x.max() - x.min()) or 1.0
+    y_span = (y.max() - y.min()) or 1.0
+    # Normalise to a unit grid, then snap each point to the nearest centre of
+    # two interleaved rectangular lattices (the standard hexbin construction)
+    sx = (x - x.min()) / x_span * gridsize
+    sy = (y - y.min()) / y_span * gridsize / np.sqrt(3)
+    ix1, iy1 = np.round(sx), np.round(sy)
+    ix2, iy2 = np.floor(sx) + 0.5, np.floor(sy) + 0.5
+    d1 = (sx - ix1) ** 2 + 3 * (sy - iy1) ** 2
+    d2 = (sx - ix2) ** 2 + 3 * (sy - iy2) ** 2
+    use1 = d1 <= d2
+    cx, cy = np.where(use1, ix1, ix2), np.where(use1, iy1, iy2)
+    cells = pd.DataFrame({"cx": cx, "cy": cy}).value_counts().reset_index(name="count")
+    return pd.DataFrame({
+        "x": x.min() + cells["cx"].to_numpy() / gridsize * x_span,
+        "y": y.min() + cells["cy"].to_numpy() * np.sqrt(3) / gridsize * y_span,
+        "count": cells["count"].to_numpy(),
+    })
+
+
+def scatter_points(df, x, y, max_points=MAX_POINTS, gridsize=40):
+    """Raw (x, y) rows when they fit in the payload, hexagonal bins otherwise; returns (frame, binned)"""
+    if len(df) <= max_points:
+        return df[[x, y]], False
+    return hexbin(df[x], df[y], gridsize, max_points), True
@@ -0,0 +1,161 @@
+from dataset_version import derive_token, fingerprint, stamp
+from star_schema import join_dimensions
+
+# ================================================================
+# COLUMN REQUIREMENTS REGISTRY
+# ================================================================
+# Each EDA section and ML model lists the source columns it reads.
+# None means "needs the full frame" (e.g. checks that scan every column).
+# Derived feature names are never listed here – only raw fact-table columns.
+
+EDA_SECTION_COLUMNS = {
+    "Data Quality Overview": None,
+    "Inventory Overview": [
+        "date", "on_hand_qty", "overstock_qty", "understock_qty", "stock_value",
+        "fill_rate_pct", "stockout_pct", "inventory_turnover", "excess_inventory_pct",
+        "region", "zone", "city", "store_type",
+    ],
+    "Product-Level Analysis": [
+        "product_id", "store_id", "route_id", "category", "region", "cluster_name",
+        "stock_value", "on_hand_qty", "overstock_qty", "understock_qty",
+        "demand_index", "overstock_index", "inventory_turnover", "fill_rate_pct",
+        "stockout_pct", "cost_price", "mrp", "delivery_time_mins", "fuel_cost",
+        "route_efficiency_score", "distance_km", "optimal_transfer_qty", "transfer_qty",
+        "transfer_cost", "cost_minimization_pct", "service_level_gain_pct",
+        "model_confidence_score", "model_version",
+    ],
+    "Supplier Analysis": [
+        "supplier_id", "product_id", "category", "region", "cost_price",
+        "lead_time_days", "rating_score", "stock_value", "demand_index",
+        "overstock_index", "inventory_turnover", "model_confidence_score",
+        "model_version",
+    ],
+    "Category & Subcategory Analysis": [
+        "category", "subcategory", "stock_value", "fill_rate_pct",
+        "delivery_time_mins", "overstock_qty", "understock_qty",
+    ],
+    "Sales Analysis": ["date", "category", "stock_value", "fill_rate_pct"],
+    "Customer Analysis": ["store_id", "stock_value", "fill_rate_pct", "on_hand_qty"],
+    "Store Analysis": [
+        "store_id", "stockout_pct", "inventory_turnover", "overstock_qty", "understock_qty",
+    ],
+    "Vendor Analysis": ["supplier_id", "rating_score", "lead_time_days", "cost_price"],
+    "Location Analysis": ["region", "zone", "city", "stock_value", "fill_rate_pct"],
+    "Warehouse Analysis": ["cluster_id", "stock_value", "inventory_turnover", "on_hand_qty"],
+    "Transport Route Analysis": [
+        "route_id", "route_efficiency_score", "delivery_time_mins", "fuel_cost",
+    ],
+    "Inventory Analysis": ["category", "on_hand_qty", "stock_value", "excess_inventory_pct"],
+    "Redistribution Analysis": [
+        "from_store_id", "to_store_id", "cluster_id", "transfer_qty", "optimal_transfer_qty",
+    ],
+    "Reallocation Analysis": [
+        "cluster_id", "cost_minimization_pct", "service_level_gain_pct",
+        "model_confidence_score",
+    ],
+    "Summary Report": [
+        "category", "region", "stock_value", "on_hand_qty", "fill_rate_pct",
+        "stockout_pct", "excess_inventory_pct", "inventory_turnover",
+    ],
+}
+
+MODEL_COLUMNS = {
+    "demand_forecasting": [
+        "date", "year", "month", "quarter", "product_id", "store_id", "category",
+        "subcategory", "on_hand_qty", "unit_price", "cost_price",
+    ],
+    "stockout": [
+        "store_id", "store_type", "category", "on_hand_qty", "demand_index",
+        "fill_rate_pct", "stockout_pct", "lead_time_days", "shelf_life_days",
+        "supplier_rating", "is_holiday", "is_weekend",
+    ],
+    "overstock": [
+        "month", "product_id", "store_id", "category", "on_hand_qty", "overstock_qty",
+        "stock_value", "demand_index", "inventory_turnover", "shelf_life_days",
+        "unit_price",
+    ],
+    "store_clustering": [
+        "store_id", "store_type", "region", "zone", "stock_value", "demand_index",
+        "fill_rate_pct", "stockout_pct", "inventory_turnover",
+    ],
+    "product_clustering": [
+        "product_id", "category", "stock_value", "demand_index", "inventory_turnover",
+        "shelf_life_days", "unit_price", "cost_price",
+    ],
+    "supplier_segmentation": [
+        "supplier_id", "supplier_rating", "lead_time_days", "fill_rate_pct",
+        "stockout_pct", "unit_price",
+    ],
+    "supply_demand_matching": [
+        "product_id", "store_id", "category", "from_store", "to_store", "on_hand_qty",
+        "overstock_qty", "understock_qty", "stockout_pct", "transfer_qty",
+        "transfer_cost", "distance_km", "fuel_cost",
+    ],
+    "transfer_quantity": [
+        "on_hand_qty", "overstock_qty", "understock_qty", "stockout_pct",
+        "transfer_qty", "distance_km", "fuel_cost",
+    ],
+    "transfer_timing": [
+        "month", "day_of_week", "is_weekend", "stockout_pct", "lead_time_days",
+        "delivery_time_mins",
+    ],
+    "route_optimization": [
+        "route_id", "store_id", "from_store", "to_store", "distance_km", "fuel_cost",
+        "delivery_time_mins", "route_efficiency_score",
+    ],
+    "delivery_time": [
+        "vehicle_id", "distance_km", "delivery_time_mins", "route_efficiency_score",
+        "is_holiday",
+    ],
+    "transport_cost": [
+        "vehicle_id", "distance_km", "fuel_cost", "route_efficiency_score", "on_hand_qty",
+    ],
+    "reorder_point": [
+        "product_id", "store_id", "demand_index", "lead_time_days", "fill_rate_pct",
+    ],
+    "safety_stock": ["product_id", "demand_index", "lead_time_days", "fill_rate_pct"],
+    "warehouse_load": ["month", "on_hand_qty", "demand_index"],
+    "storage_optimization": ["product_id", "stock_value", "demand_index", "inventory_turnover"],
+    "lead_time": [
+        "month", "supplier_id", "supplier_rating", "lead_time_days", "distance_km",
+        "on_hand_qty",
+    ],
+    "supplier_risk": [
+        "supplier_id", "supplier_rating", "lead_time_days", "fill_rate_pct", "unit_price",
+    ],
+    "rl_agent": ["on_hand_qty", "demand_index", "fuel_cost", "stockout_pct", "overstock_qty"],
+    # Isolation Forest scans every numeric column
+    "anomaly_detection": None,
+}
+
+
+def required_columns(name):
+    """Columns registered for an EDA section or model (None = all columns)"""
+    if name in EDA_SECTION_COLUMNS:
+        return EDA_SECTION_COLUMNS[name]
+    return MODEL_COLUMNS.get(name)
+
+
+def project_frame(df, name, dimensions=None):
+    """
+    Narrow a frame to the columns a section/model needs, keeping column order.
+    With star-schema dimensions, the needed dimension attributes are joined on.
+    """
+    if df is None:
+        return df
+    needed = required_columns(name)
+    if dimensions:
+        projected = join_dimensions(df, dimensions, needed)
+    elif needed is None:
+        return df
+    else:
+        needed = set(needed)
+        cols = [c for c in df.columns if c in needed]
+        if len(cols) == len(df.columns):
+            return df
+        projected = df[cols]
+    # The projection is rebuilt every rerun; derive its cache token from the parent's
+    dim_tokens = [fingerprint(d["table"]) for d in (dimensions or {}).values()]
+    stamp(projected, derive_token("project_frame", fingerprint(df), name, *dim_tokens))
+    return projected
+
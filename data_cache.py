@@ -0,0 +1,444 @@
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import FrameSketch, merge_sketches
+
+try:
+    import pyarrow  # noqa: F401
+except Exception:
+    pyarrow = None
+
+
+# ================================================================
+# COLUMNAR (PARQUET) CACHE FOR CSV SOURCES
+# ================================================================
+CACHE_FORMAT_VERSION = 4
+MANIFEST_NAME = "manifest.json"
+HASH_CHUNK_BYTES = 8 * 1024 * 1024
+CSV_CHUNK_ROWS = 200_000
+SKETCH_SUFFIX = ".sketch.json"
+_PARTITION_RE = re.compile(r"^year=(\d{4})/month=(\d{2})/")
+# Source-row ordinal stored in every part: reads restore CSV order with it,
+# so a warm (partitioned) load returns exactly what a cold load returns
+ROW_ORDINAL = "__source_row__"
+
+
+def default_cache_dir(csv_path):
+    """Cache directory that sits next to the source CSV"""
+    csv_path = os.path.abspath(csv_path)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(os.path.dirname(csv_path), ".parquet_cache", stem)
+
+
+def file_signature(path):
+    """Cheap change detector for a source file (size + mtime)"""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def content_hash(path, chunk_bytes=HASH_CHUNK_BYTES):
+    """Streaming BLAKE2b digest of the file contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(cache_dir):
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(cache_dir, manifest):
+    """Write the manifest atomically so readers never see a partial file"""
+    path = os.path.join(cache_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _dtype_key(dtype_spec):
+    return json.dumps({k: str(v) for k, v in (dtype_spec or {}).items()}, sort_keys=True)
+
+
+def _manifest_matches(manifest, dtype_spec):
+    return (
+        manifest is not None
+        and manifest.get("format_version") == CACHE_FORMAT_VERSION
+        and manifest.get("dtype_key") == _dtype_key(dtype_spec)
+    )
+
+
+def _parts_exist(cache_dir, manifest):
+    return all(os.path.exists(os.path.join(cache_dir, p)) for p in manifest.get("parts", []))
+
+
+def _write_part(cache_dir, df, name):
+    path = os.path.join(cache_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, engine="pyarrow", index=False)
+    os.replace(tmp_path, path)
+    _write_sketch(cache_dir, FrameSketch.from_frame(df.drop(columns=ROW_ORDINAL, errors="ignore")), name)
+
+
+def _write_sketch(cache_dir, sketch, name):
+    """Quantile sketch of a part, stored next to it (<part>.sketch.json)"""
+    path = os.path.join(cache_dir, name + SKETCH_SUFFIX)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(sketch.to_dict(), fh)
+    os.replace(tmp_path, path)
+
+
+def _read_sketch(cache_dir, name):
+    """A part's sketch; parts written before sketches existed are sketched once, lazily"""
+    try:
+        with open(os.path.join(cache_dir, name + SKETCH_SUFFIX), "r", encoding="utf-8") as fh:
+            return FrameSketch.from_dict(json.load(fh))
+    except (OSError, ValueError):
+        part = pd.read_parquet(os.path.join(cache_dir, name), engine="pyarrow")
+        sketch = FrameSketch.from_frame(part.drop(columns=ROW_ORDINAL, errors="ignore"))
+        _write_sketch(cache_dir, sketch, name)
+        return sketch
+
+
+def _write_partitioned(cache_dir, df, seq, date_column="date", first_row=0):
+    """
+    Write df as Hive-style year=YYYY/month=MM/part-<seq>.parquet files.
+    Rows without a parseable date (or frames without a date column) go to a
+    root-level part that is only read when no date window is requested.
+    Each row carries its source position (first_row + offset) in ROW_ORDINAL.
+    Returns the relative part paths in chronological order.
+    """
+    name = f"part-{seq:05d}.parquet"
+    df = df.assign(**{ROW_ORDINAL: np.arange(first_row, first_row + len(df), dtype=np.int64)})
+    if date_column not in df.columns:
+        _write_part(cache_dir, df, name)
+        return [name]
+
+    dates = pd.to_datetime(df[date_column], errors="coerce")
+    groups = df.groupby([dates.dt.year, dates.dt.month], sort=True, dropna=False).indices
+
+    parts = []
+    for (year, month), positions in groups.items():
+        if pd.isna(year) or pd.isna(month):
+            rel = name
+        else:
+            rel = f"year={int(year):04d}/month={int(month):02d}/{name}"
+        _write_part(cache_dir, df.take(positions), rel)
+        parts.append(rel)
+    return parts
+
+
+def _part_month(part):
+    """(year, month) encoded in a part path, or None for the unpartitioned part"""
+    match = _PARTITION_RE.match(part)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _month_of(value):
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    return ts.year, ts.month
+
+
+def prune_parts(parts, date_from=None, date_to=None):
+    """
+    Keep only the parts whose month can overlap the half-open window
+    [date_from, date_to). With no window every part is kept.
+    """
+    if date_from is None and date_to is None:
+        return list(parts)
+    lo = _month_of(date_from)
+    hi = _month_of(pd.Timestamp(date_to) - pd.Timedelta(days=1)) if date_to is not None else None
+    kept = []
+    for part in parts:
+        month = _part_month(part)
+        if month is None:
+            continue
+        if lo is not None and month < lo:
+            continue
+        if hi is not None and month > hi:
+            continue
+        kept.append(part)
+    return kept
+
+
+def filter_date_window(df, date_from=None, date_to=None, date_column="date"):
+    """Row-level [date_from, date_to) filter (partition pruning is month-granular)"""
+    if (date_from is None and date_to is None) or date_column not in df.columns:
+        return df
+    dates = pd.to_datetime(df[date_column], errors="coerce")
+    mask = dates.notna()
+    if date_from is not None:
+        mask &= dates >= pd.Timestamp(date_from)
+    if date_to is not None:
+        mask &= dates < pd.Timestamp(date_to)
+    if mask.all():
+        return df
+    return df[mask.to_numpy()].reset_index(drop=True)
+
+
+def concat_frames(frames, dtype_spec=None):
+    """Concatenate frames and restore dtypes that concat widened (e.g. categories)"""
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    if dtype_spec:
+        fixes = {
+            c: t for c, t in dtype_spec.items()
+            if c in df.columns and str(df[c].dtype) != str(t)
+        }
+        if fixes:
+            df = df.astype(fixes)
+    return df
+
+
+def _read_parts(cache_dir, manifest, dtype_spec, date_from=None, date_to=None, date_column="date",
+                progress=None):
+    parts = prune_parts(manifest["parts"], date_from, date_to)
+    if not parts:
+        return pd.DataFrame(columns=manifest["columns"]).astype(
+            {c: t for c, t in (dtype_spec or {}).items() if c in manifest["columns"]}
+        )
+    paths = [os.path.join(cache_dir, p) for p in parts]
+    total_bytes = sum(os.path.getsize(p) for p in paths)
+    frames, rows, bytes_read = [], 0, 0
+    for path in paths:
+        frames.append(pd.read_parquet(path, engine="pyarrow"))
+        if progress is not None:
+            rows += len(frames[-1])
+            bytes_read += os.path.getsize(path)
+            progress(rows, bytes_read, total_bytes)
+    df = concat_frames(frames, dtype_spec)
+    if ROW_ORDINAL in df.columns:
+        # Partitions are month-ordered; put rows back in source (CSV) order
+        ordinal = df[ROW_ORDINAL].to_numpy()
+        if len(ordinal) > 1 and not (ordinal[1:] > ordinal[:-1]).all():
+            df = df.take(np.argsort(ordinal, kind="stable"))
+        df = df.drop(columns=ROW_ORDINAL).reset_index(drop=True)
+    return filter_date_window(df, date_from, date_to, date_column)
+
+
+def read_sketches(csv_path, dtype_spec=None, cache_dir=None, date_from=None, date_to=None):
+    """
+    Merged quantile sketch of the cached dataset, without reading any rows.
+
+    Each Parquet part carries a sketch of its numeric columns, so per-column
+    count / mean / std / min / max and approximate percentiles for the whole
+    dataset (or the month partitions overlapping [date_from, date_to)) come
+    from merging a few KB per part. Returns None when there is no valid cache.
+    """
+    if pyarrow is None:
+        return None
+    cache_dir = cache_dir or default_cache_dir(csv_path)
+    manifest = read_manifest(cache_dir)
+    if not _manifest_matches(manifest, dtype_spec) or not _parts_exist(cache_dir, manifest):
+        return None
+    return merge_sketches(_read_sketch(cache_dir, p) for p in prune_parts(manifest["parts"], date_from, date_to))
+
+
+def dataset_watermark(df, date_column="date"):
+    """Latest date present in the frame as an ISO string (None if unavailable)"""
+    if df is None or date_column not in df.columns or df.empty:
+        return None
+    latest = pd.to_datetime(df[date_column], errors="coerce").max()
+    return None if pd.isna(latest) else latest.date().isoformat()
+
+
+def read_csv_with_progress(csv_path, dtype_spec=None, progress=None, chunk_rows=CSV_CHUNK_ROWS):
+    """pd.read_csv, reading in row chunks and reporting (rows, bytes_read, total_bytes) when asked"""
+    if progress is None:
+        return pd.read_csv(csv_path, dtype=dtype_spec)
+    total_bytes = os.path.getsize(csv_path)
+    frames, rows = [], 0
+    with open(csv_path, "rb") as fh:
+        for chunk in pd.read_csv(fh, dtype=dtype_spec, chunksize=chunk_rows):
+            frames.append(chunk)
+            rows += len(chunk)
+            progress(rows, min(fh.tell(), total_bytes), total_bytes)
+    if not frames:
+        return pd.read_csv(csv_path, dtype=dtype_spec)
+    return concat_frames(frames, dtype_spec)
+
+
+def _rebuild(csv_path, cache_dir, dtype_spec, signature, digest, date_column="date", progress=None):
+    df = read_csv_with_progress(csv_path, dtype_spec, progress)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith("year=") and os.path.isdir(path):
+            shutil.rmtree(path)
+        elif name.endswith(".parquet") or name.endswith(SKETCH_SUFFIX):
+            os.remove(path)
+    parts = _write_partitioned(cache_dir, df, 0, date_column)
+
+    write_manifest(cache_dir, {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source": os.path.abspath(csv_path),
+        "size": signature["size"],
+        "mtime_ns": signature["mtime_ns"],
+        "content_hash": digest,
+        "dtype_key": _dtype_key(dtype_spec),
+        "columns": [str(c) for c in df.columns],
+        "parts": parts,
+        "next_part": 1,
+        "rows": int(len(df)),
+        "watermark": dataset_watermark(df, date_column),
+    })
+    return df
+
+
+def load_csv_cached(csv_path, dtype_spec=None, cache_dir=None, date_from=None, date_to=None,
+                    date_column="date", progress=None):
+    """
+    Read a CSV through a transparent Parquet cache partitioned by year/month.
+
+    The cache is valid while the CSV's size and mtime match the manifest.
+    If only the mtime moved (e.g. the file was touched or re-copied), the
+    content hash decides whether a rebuild is really needed.
+    A [date_from, date_to) window only opens the matching month partitions.
+    progress, if given, is called as progress(rows, bytes_read, total_bytes).
+    """
+    if pyarrow is None:
+        df = read_csv_with_progress(csv_path, dtype_spec, progress)
+        return filter_date_window(df, date_from, date_to, date_column)
+
+    cache_dir = cache_dir or default_cache_dir(csv_path)
+    signature = file_signature(csv_path)
+    manifest = read_manifest(cache_dir)
+
+    digest = None
+    if _manifest_matches(manifest, dtype_spec) and _parts_exist(cache_dir, manifest):
+        if manifest.get("size") == signature["size"]:
+            if manifest.get("mtime_ns") == signature["mtime_ns"]:
+                return _read_parts(cache_dir, manifest, dtype_spec, date_from, date_to, date_column,
+                                   progress)
+
+            digest = content_hash(csv_path)
+            if digest == manifest.get("content_hash"):
+                manifest["mtime_ns"] = signature["mtime_ns"]
+                write_manifest(cache_dir, manifest)
+                return _read_parts(cache_dir, manifest, dtype_spec, date_from, date_to, date_column,
+                                   progress)
+
+    df = _rebuild(csv_path, cache_dir, dtype_spec, signature, digest or content_hash(csv_path),
+                  date_column, progress)
+    return filter_date_window(df, date_from, date_to, date_column)
+
+
+def _read_appended_tail(csv_path, known_size, known_hash, chunk_bytes=HASH_CHUNK_BYTES):
+    """
+    Verify that the first known_size bytes are unchanged and return the bytes
+    appended after them, plus the digest of the whole file (one sequential pass).
+    Returns (None, None) when the file was modified rather than appended to.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    last_byte = b""
+    with open(csv_path, "rb") as fh:
+        remaining = known_size
+        while remaining > 0:
+            block = fh.read(min(chunk_bytes, remaining))
+            if not block:
+                return None, None
+            digest.update(block)
+            last_byte = block[-1:]
+            remaining -= len(block)
+        if digest.hexdigest() != known_hash or last_byte != b"\n":
+            return None, None
+        tail = fh.read()
+    digest.update(tail)
+    return tail, digest.hexdigest()
+
+
+def _rows_after(cache_dir, manifest, dtype_spec, watermark, date_from=None, date_to=None,
+                date_column="date"):
+    """Cached rows dated strictly after watermark (and inside [date_from, date_to))"""
+    after = pd.Timestamp(watermark)
+    lower = after if date_from is None else max(after, pd.Timestamp(date_from))
+    df = _read_parts(cache_dir, manifest, dtype_spec, lower, date_to, date_column)
+    if df.empty or date_column not in df.columns:
+        return df
+    newer = (pd.to_datetime(df[date_column], errors="coerce") > after).to_numpy()
+    return df if newer.all() else df[newer].reset_index(drop=True)
+
+
+def refresh_csv_cache(csv_path, dtype_spec=None, cache_dir=None, date_column="date",
+                      date_from=None, date_to=None, watermark=None):
+    """
+    Incrementally bring the Parquet cache up to date with an append-only CSV.
+
+    Returns (mode, frame), with frame restricted to the [date_from, date_to) window:
+      "unchanged" – nothing new, frame is empty
+      "append"    – frame holds only the new rows
+      "full"      – the CSV was rewritten; frame is the complete rebuilt dataset
+
+    With a watermark (the latest date of the frame the caller holds), "new"
+    means every cached row dated after it, whoever appended it to the cache;
+    without one it means the bytes appended since the cache was last updated.
+    """
+    cache_dir = cache_dir or default_cache_dir(csv_path)
+    manifest = read_manifest(cache_dir)
+    signature = file_signature(csv_path)
+
+    if (
+        pyarrow is None
+        or not _manifest_matches(manifest, dtype_spec)
+        or not _parts_exist(cache_dir, manifest)
+        or signature["size"] < manifest.get("size", 0)
+    ):
+        return "full", load_csv_cached(csv_path, dtype_spec, cache_dir, date_from, date_to, date_column)
+
+    def since_watermark():
+        rows = _rows_after(cache_dir, manifest, dtype_spec, watermark, date_from, date_to, date_column)
+        return ("append" if len(rows) else "unchanged"), rows
+
+    if signature["size"] == manifest["size"] and signature["mtime_ns"] == manifest["mtime_ns"]:
+        if watermark is not None:
+            return since_watermark()
+        return "unchanged", pd.DataFrame(columns=manifest["columns"])
+
+    tail, digest = _read_appended_tail(csv_path, manifest["size"], manifest["content_hash"])
+    if tail is None:
+        df = _rebuild(csv_path, cache_dir, dtype_spec, signature, content_hash(csv_path), date_column)
+        return "full", filter_date_window(df, date_from, date_to, date_column)
+
+    manifest.update({
+        "size": manifest["size"] + len(tail),
+        "mtime_ns": signature["mtime_ns"],
+        "content_hash": digest,
+    })
+    if not tail.strip():
+        write_manifest(cache_dir, manifest)
+        if watermark is not None:
+            return since_watermark()
+        return "unchanged", pd.DataFrame(columns=manifest["columns"])
+
+    new_rows = pd.read_csv(io.BytesIO(tail), header=None, names=manifest["columns"], dtype=dtype_spec)
+    seq = manifest.get("next_part", len(manifest["parts"]))
+    manifest["parts"].extend(_write_partitioned(cache_dir, new_rows, seq, date_column,
+                                                first_row=manifest.get("rows", 0)))
+    manifest["next_part"] = seq + 1
+
+    new_watermark = dataset_watermark(new_rows, date_column)
+    if new_watermark and (manifest.get("watermark") is None or new_watermark > manifest["watermark"]):
+        manifest["watermark"] = new_watermark
+    manifest["rows"] = manifest.get("rows", 0) + int(len(new_rows))
+    write_manifest(cache_dir, manifest)
+    if watermark is not None:
+        return since_watermark()
+    return "append", filter_date_window(new_rows, date_from, date_to, date_column)
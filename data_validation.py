@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+from star_schema import key_column
+
+
+# ================================================================
+# VECTORIZED FACT-TABLE VALIDATION
+# ================================================================
+# Every check works on whole columns (isin / comparisons / sorted diffs);
+# nothing iterates rows in Python, so this is cheap enough to run on every load.
+KEY_COLUMNS = ["product_id", "store_id", "route_id", "vehicle_id", "supplier_id", "cluster_id"]
+
+# (referencing column, referenced key column)
+FOREIGN_KEYS = [
+    ("from_store_id", "store_id"),
+    ("to_store_id", "store_id"),
+    ("from_store", "store_id"),
+    ("to_store", "store_id"),
+]
+
+NON_NEGATIVE_COLUMNS = [
+    "stock_value", "cost_price", "mrp", "unit_price", "fuel_cost", "transfer_cost",
+    "distance_km", "lead_time_days", "delivery_time_mins", "shelf_life_days",
+]
+
+SERIES_KEYS = ["product_id", "store_id"]
+
+
+def _issue(check, column, mask, df, sample_rows, sample_cols, rows_checked=None):
+    positions = np.flatnonzero(mask)
+    cols = [c for c in dict.fromkeys(sample_cols) if c in df.columns]
+    return {
+        "check": check,
+        "column": column,
+        "violations": int(positions.size),
+        "rows_checked": int(rows_checked if rows_checked is not None else len(df)),
+        "sample": df.iloc[positions[:sample_rows]][cols].reset_index(drop=True),
+    }
+
+
+def _key_values(df, column, dimensions):
+    """Natural key values for a column, resolving star-schema surrogate keys"""
+    if column in df.columns:
+        return df[column]
+    for d in (dimensions or {}).values():
+        if d["key"] == column and d["surrogate"] in df.columns:
+            return d["table"][column]
+    return None
+
+
+def check_referential_integrity(df, dimensions=None, sample_rows=5, date_column="date"):
+    issues = []
+    for col in KEY_COLUMNS:
+        if col in df.columns:
+            values = df[col]
+            mask = values.isna().to_numpy()
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Only the (few) categories need string checks, not every row
+                cats = values.cat.categories
+                blank = cats[cats.astype(str).str.strip() == ""]
+                mask = mask | values.isin(blank).to_numpy()
+            elif values.dtype == object or pd.api.types.is_string_dtype(values):
+                mask = mask | (values.astype(str).str.strip() == "").to_numpy()
+            issues.append(_issue("Missing key", col, mask, df, sample_rows, [date_column, *KEY_COLUMNS]))
+
+    for d in (dimensions or {}).values():
+        surrogate = d["surrogate"]
+        if surrogate in df.columns:
+            codes = df[surrogate].to_numpy()
+            mask = (codes < 0) | (codes >= len(d["table"]))
+            issues.append(_issue("Orphan surrogate key", surrogate, mask, df, sample_rows,
+                                 [date_column, surrogate]))
+
+    for ref_col, key_col in FOREIGN_KEYS:
+        if ref_col not in df.columns:
+            continue
+        known = _key_values(df, key_col, dimensions)
+        if known is None:
+            continue
+        refs = df[ref_col]
+        mask = (refs.notna() & ~refs.isin(pd.unique(known.dropna()))).to_numpy()
+        issues.append(_issue(f"Orphan reference to {key_col}", ref_col, mask, df, sample_rows,
+                             [date_column, ref_col, key_col]))
+    return issues
+
+
+def check_value_ranges(df, sample_rows=5, date_column="date"):
+    issues = []
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+            continue
+        values = df[col]
+        if col.endswith("_pct"):
+            mask = ((values < 0) | (values > 100)).to_numpy()
+            issues.append(_issue("Percentage outside 0–100", col, mask, df, sample_rows,
+                                 [date_column, *SERIES_KEYS, col]))
+        elif col.endswith("_qty") or col in NON_NEGATIVE_COLUMNS:
+            mask = (values < 0).to_numpy()
+            issues.append(_issue("Negative value", col, mask, df, sample_rows,
+                                 [date_column, *SERIES_KEYS, col]))
+    return issues
+
+
+def _series_codes(df, keys, dimensions):
+    """One int64 code per (key1, key2, ...) combination, using surrogate keys when present"""
+    combined = np.zeros(len(df), dtype=np.int64)
+    columns = []
+    for key in keys:
+        col = key_column(df, key, dimensions)
+        if col is None:
+            return None, []
+        codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+        combined = combined * (len(uniques) + 1) + codes
+        columns.append(col)
+    return combined, columns
+
+
+def check_dates(df, dimensions=None, sample_rows=5, date_column="date", series_keys=SERIES_KEYS):
+    """Unparseable dates, plus gaps in each product/store series larger than the dataset's cadence"""
+    if date_column not in df.columns:
+        return []
+    raw = df[date_column]
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        dates = raw
+    else:
+        # Parse each distinct date string once (a few thousand) instead of every row
+        codes, uniques = pd.factorize(raw)
+        parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(dtype="datetime64[ns]")
+        # Missing values have code -1, which picks the trailing NaT (also when every value is missing)
+        parsed = np.append(parsed, np.datetime64("NaT", "ns"))
+        dates = pd.Series(parsed[codes], index=raw.index)
+    issues = [_issue("Unparseable date", date_column, (dates.isna() & raw.notna()).to_numpy(),
+                     df, sample_rows, [date_column, *series_keys])]
+
+    series, key_cols = _series_codes(df, series_keys, dimensions)
+    if series is None:
+        return issues
+
+    day = dates.to_numpy().astype("datetime64[D]")
+    valid = ~np.isnat(day)
+    if valid.sum() < 2:
+        return issues
+    day_num = day[valid].astype(np.int64)
+    origin = day_num.min()
+    span = day_num.max() - origin + 1
+    # One sort over (series, day) packed into a single int64, then drop repeats
+    packed = np.sort(series[valid] * span + (day_num - origin))
+    packed = packed[np.concatenate(([True], packed[1:] != packed[:-1]))]
+    s = packed // span
+    d = packed % span
+
+    same = s[1:] == s[:-1]
+    step_days = (d[1:] - d[:-1]).astype(np.float64)
+    within = step_days[same]
+    if within.size == 0:
+        return issues
+    # Cadence = most common spacing (daily, weekly snapshots, ...)
+    values, counts = np.unique(within, return_counts=True)
+    cadence = values[counts.argmax()]
+    gap = same & (step_days > cadence)
+    gap_pos = np.flatnonzero(gap)
+
+    shown = gap_pos[:sample_rows]
+    first_rows = [int(np.argmax(series == code)) for code in s[shown]]
+    sample = df.iloc[first_rows][key_cols].reset_index(drop=True)
+    sample["last_date"] = pd.to_datetime(d[shown] + origin, unit="D")
+    sample["next_date"] = pd.to_datetime(d[shown + 1] + origin, unit="D")
+    sample["missing_periods"] = (step_days[shown] / cadence - 1).round().astype(int)
+
+    issues.append({
+        "check": f"Date gap in {' / '.join(series_keys)} series (cadence {cadence:g} day(s))",
+        "column": date_column,
+        "violations": int(gap_pos.size),
+        "rows_checked": int(len(s)),
+        "sample": sample,
+    })
+    return issues
+
+
+def validate_frame(df, dimensions=None, sample_rows=5, date_column="date"):
+    """
+    Run every check and return a list of issues:
+    {"check", "column", "violations", "rows_checked", "sample" (DataFrame)}.
+    Checks with zero violations are included so the report shows what passed.
+    """
+    issues = []
+    issues += check_referential_integrity(df, dimensions, sample_rows, date_column)
+    issues += check_value_ranges(df, sample_rows, date_column)
+    issues += check_dates(df, dimensions, sample_rows, date_column)
+    return issues
+
+
+def summarize_issues(issues):
+    """Tabular summary for display"""
+    return pd.DataFrame([
+        {
+            "Check": i["check"],
+            "Column": i["column"],
+            "Violations": i["violations"],
+            "Violation %": round(100 * i["violations"] / i["rows_checked"], 2) if i["rows_checked"] else 0.0,
+        }
+        for i in issues
+    ], columns=["Check", "Column", "Violations", "Violation %"])
@@ -0,0 +1,128 @@
+import functools
+import hashlib
+import pickle
+import weakref
+
+import pandas as pd
+import streamlit as st
+
+
+# ================================================================
+# DATASET FINGERPRINT TOKENS
+# ================================================================
+# st.cache_data normally hashes every DataFrame argument on every call.
+# Instead each frame object carries a short token: frames coming out of a
+# cached function get a token derived from their inputs' tokens (no data
+# is read), and any other frame is content-hashed once, then remembered
+# for as long as that object lives. A stamped frame keeps a shallow view of
+# itself alongside its token: under pandas copy-on-write, writing values into
+# a frame that has a live view replaces the written block instead of updating
+# it in place, so comparing the frame's arrays with the ones recorded at
+# stamping time catches in-place edits (df.loc[i, c] = v) without reading data.
+
+_tokens = {}
+
+
+def _layout(obj):
+    if isinstance(obj, pd.Series):
+        return (obj.shape, str(obj.name), str(obj.dtype))
+    return (obj.shape, tuple(map(str, obj.columns)))
+
+
+def _arrays(obj):
+    return tuple(obj._mgr.arrays)
+
+
+def _unchanged(obj, entry):
+    _, layout, arrays, _ = entry
+    current = _arrays(obj)
+    return layout == _layout(obj) and len(current) == len(arrays) and all(
+        a is b for a, b in zip(current, arrays)
+    )
+
+
+def stamp(df, token):
+    """Attach a known token to a frame (e.g. one derived from its parent's token)"""
+    key = id(df)
+    if key not in _tokens:
+        weakref.finalize(df, _tokens.pop, key, None)
+    # The view is only held so that writes into df copy (see above)
+    _tokens[key] = (token, _layout(df), _arrays(df), df.copy(deep=False))
+    return token
+
+
+def content_token(df):
+    """Full content hash (values, index, column names and dtypes)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(_layout(df)).encode())
+    if isinstance(df, pd.DataFrame):
+        digest.update(repr([str(t) for t in df.dtypes]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint(df):
+    """Cheap, stable token for a DataFrame/Series (content-hashed at most once per object)"""
+    entry = _tokens.get(id(df))
+    if entry is not None and _unchanged(df, entry):
+        return entry[0]
+    return stamp(df, content_token(df))
+
+
+def derive_token(*parts):
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(repr(part).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _arg_token(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return fingerprint(value)
+    try:
+        return hashlib.blake2b(pickle.dumps(value), digest_size=16).hexdigest()
+    except Exception:
+        return None
+
+
+def _stamp_outputs(result, base):
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        stamp(result, derive_token(base, 0))
+    elif isinstance(result, tuple):
+        for i, item in enumerate(result):
+            if isinstance(item, (pd.DataFrame, pd.Series)):
+                stamp(item, derive_token(base, i))
+
+
+FRAME_HASH_FUNCS = {pd.DataFrame: fingerprint, pd.Series: fingerprint}
+
+
+def cache_frames(func=None, **cache_kwargs):
+    """
+    Drop-in for @st.cache_data on functions that take DataFrames.
+
+    DataFrame/Series arguments are keyed by fingerprint() instead of a full hash, and
+    DataFrames in the result are stamped with a token derived from the call,
+    so chained cached calls (load → preprocess → features → model) never rehash.
+    """
+    if func is None:
+        return functools.partial(cache_frames, **cache_kwargs)
+
+    hash_funcs = {**FRAME_HASH_FUNCS, **cache_kwargs.pop("hash_funcs", {})}
+    cached = st.cache_data(func, hash_funcs=hash_funcs, **cache_kwargs)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = cached(*args, **kwargs)
+        frames = [a for a in list(args) + list(kwargs.values()) if isinstance(a, (pd.DataFrame, pd.Series))]
+        if frames:
+            arg_tokens = [_arg_token(a) for a in args] + [
+                (k, _arg_token(v)) for k, v in sorted(kwargs.items())
+            ]
+            if all(t is not None and (not isinstance(t, tuple) or t[1] is not None) for t in arg_tokens):
+                _stamp_outputs(result, derive_token(func.__module__, func.__qualname__, *arg_tokens))
+        return result
+
+    wrapper.clear = cached.clear
+    return wrapper
@@ -0,0 +1,204 @@
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# HASH-BASED DUPLICATE DETECTION
+# ================================================================
+class DuplicateResult:
+    """
+    Exact-duplicate analysis stored as arrays instead of frame copies.
+
+    group_code[i] is the position, in the de-duplicated frame, of the row
+    that original row i duplicates (or is). Because dropped rows are identical
+    to the kept row they map to, the before / removed views can be rebuilt
+    from the de-duplicated frame alone, and only when they are displayed.
+    """
+
+    def __init__(self, group_code, drop_mask, group_mask):
+        self.group_code = group_code
+        self.drop_mask = drop_mask
+        self.group_mask = group_mask
+
+    @property
+    def n_before(self):
+        return len(self.group_code)
+
+    @property
+    def n_removed(self):
+        return int(self.drop_mask.sum())
+
+    @property
+    def n_after(self):
+        return self.n_before - self.n_removed
+
+    @property
+    def removed_index(self):
+        return np.flatnonzero(self.drop_mask)
+
+    def apply(self, df):
+        """The de-duplicated frame (the only full copy this engine makes)"""
+        if not self.drop_mask.any():
+            return df
+        return df[~self.drop_mask].reset_index(drop=True)
+
+    def before_view(self, after_df, limit=None):
+        return after_df.take(self.group_code[:limit]).reset_index(drop=True)
+
+    def removed_view(self, after_df, limit=None):
+        return after_df.take(self.group_code[self.drop_mask][:limit]).reset_index(drop=True)
+
+    def group_view(self, after_df, limit=None):
+        """Every row that takes part in a duplicate group (all copies)"""
+        return after_df.take(self.group_code[self.group_mask][:limit]).reset_index(drop=True)
+
+
+# Second, independent hash key used to confirm matches on the first hash
+_VERIFY_HASH_KEY = "supplysync_dup_2"
+
+
+def row_hashes(df, hash_key=None):
+    """One 64-bit hash per row over all values (index excluded)"""
+    if hash_key is None:
+        return pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return pd.util.hash_pandas_object(df, index=False, hash_key=hash_key).to_numpy()
+
+
+def _exact_group_codes(df):
+    return df.groupby(list(df.columns), sort=False, dropna=False, observed=True).ngroup().to_numpy()
+
+
+def find_duplicates(df):
+    """
+    Locate exact duplicate rows (keep="first" semantics, like drop_duplicates).
+
+    Rows are hashed once; duplicates are found on the hash column. Matches are
+    confirmed with a second, independently keyed hash (a 128-bit match overall),
+    and the (practically never taken) collision path falls back to an exact group-by.
+    """
+    hashes = row_hashes(df)
+    # factorize numbers groups in order of first appearance, so a group's code is
+    # also the position of its kept row in the de-duplicated frame
+    codes, _ = pd.factorize(hashes)
+    drop_mask = pd.Series(codes).duplicated(keep="first").to_numpy()
+    if drop_mask.any():
+        first_pos = np.flatnonzero(~drop_mask)
+        drop_pos = np.flatnonzero(drop_mask)
+        verify = row_hashes(df, _VERIFY_HASH_KEY)
+        if not np.array_equal(verify[drop_pos], verify[first_pos[codes[drop_pos]]]):
+            codes = _exact_group_codes(df)
+            drop_mask = pd.Series(codes).duplicated(keep="first").to_numpy()
+
+    group_sizes = np.bincount(codes, minlength=codes.max() + 1 if len(codes) else 0)
+    group_mask = group_sizes[codes] > 1 if len(codes) else np.zeros(0, dtype=bool)
+    return DuplicateResult(codes.astype(np.int32 if len(df) < 2**31 else np.int64), drop_mask, group_mask)
+
+
+# ================================================================
+# BUSINESS-KEY (NEAR-DUPLICATE) RESOLUTION
+# ================================================================
+DEFAULT_BUSINESS_KEYS = ["product_id", "store_id", "date"]
+
+KEY_POLICIES = {
+    "latest": "Keep the latest row (last ingested, or highest order column)",
+    "max_on_hand": "Keep the row with the highest on_hand_qty",
+    "mean": "Average measure columns; IDs, calendar fields and other columns from the latest row",
+}
+
+# Columns that identify or date a row rather than measure it: averaging them
+# would produce fractional IDs and calendar values
+CALENDAR_COLUMNS = {"year", "quarter", "month", "week", "week_of_year", "day", "day_of_week",
+                    "day_of_month", "day_of_year"}
+
+
+def measure_columns(df, exclude=()):
+    """
+    Numeric columns that can be averaged: everything numeric except IDs
+    (*_id / id), calendar fields and flags (is_*, booleans).
+    """
+    measures = []
+    for c in df.columns:
+        dtype = df[c].dtype
+        if c in exclude or not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            continue
+        name = str(c).lower()
+        if name == "id" or name.endswith("_id") or name.startswith("is_") or name in CALENDAR_COLUMNS:
+            continue
+        measures.append(c)
+    return measures
+
+
+def _group_codes(df, keys):
+    """Dense int64 code per key combination (hash factorize, linear in rows)"""
+    combined = np.zeros(len(df), dtype=np.int64)
+    for key in keys:
+        codes, uniques = pd.factorize(df[key], use_na_sentinel=False)
+        combined = combined * (len(uniques) + 1) + codes
+    codes, _ = pd.factorize(combined)
+    return codes
+
+
+def resolve_key_duplicates(df, keys=DEFAULT_BUSINESS_KEYS, policy="latest", order_by=None,
+                           max_column="on_hand_qty"):
+    """
+    Collapse rows sharing the same business key to one row per key.
+
+    Keys are reduced to one dense group code per row (hash factorize), and every
+    policy is a linear pass over those codes – no comparison sort of the frame.
+    Kept rows stay in their original order. Returns (resolved_df, report) where
+    report counts collapsed groups and how many of them actually disagreed on
+    some value (conflicts, as opposed to exact copies).
+    """
+    if policy not in KEY_POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}; expected one of {list(KEY_POLICIES)}")
+    missing = [k for k in keys if k not in df.columns]
+    if missing:
+        raise KeyError(f"Business key columns not found: {missing}")
+
+    n = len(df)
+    codes = _group_codes(df, keys)
+    sizes = np.bincount(codes) if n else np.zeros(0, dtype=np.int64)
+    codes_s = pd.Series(codes)
+
+    if policy == "max_on_hand" and max_column in df.columns:
+        rank = pd.to_numeric(df[max_column], errors="coerce").fillna(-np.inf).to_numpy()
+        is_max = rank == pd.Series(rank).groupby(codes).transform("max").to_numpy()
+        # Ties on the max resolve to the latest of the tied rows
+        keep_mask = is_max & ~codes_s.where(is_max).duplicated(keep="last").to_numpy()
+    elif order_by is not None and order_by in df.columns:
+        latest = pd.Series(pd.factorize(df[order_by], sort=True)[0])
+        is_latest = latest.to_numpy() == latest.groupby(codes).transform("max").to_numpy()
+        keep_mask = is_latest & ~codes_s.where(is_latest).duplicated(keep="last").to_numpy()
+    else:
+        keep_mask = ~codes_s.duplicated(keep="last").to_numpy()
+
+    resolved = df[keep_mask].reset_index(drop=True)
+
+    # Conflicts: groups whose rows do not all hash the same (only multi-row groups are hashed)
+    in_multi = sizes[codes] > 1 if n else np.zeros(0, dtype=bool)
+    multi_groups = int((sizes > 1).sum())
+    conflicting_groups = 0
+    if in_multi.any():
+        hashes = pd.Series(row_hashes(df[in_multi]))
+        spread = hashes.groupby(codes[in_multi]).agg(["min", "max"])
+        conflicting_groups = int((spread["min"] != spread["max"]).sum())
+
+    if policy == "mean" and in_multi.any():
+        numeric = measure_columns(df, exclude=keys)
+        if numeric:
+            means = df[numeric].groupby(codes, sort=True).mean()
+            kept_codes = codes[keep_mask]
+            for c in numeric:
+                resolved[c] = means[c].to_numpy()[kept_codes]
+
+    report = {
+        "keys": list(keys),
+        "policy": policy,
+        "rows_before": int(n),
+        "rows_after": int(len(resolved)),
+        "rows_removed": int(n - len(resolved)),
+        "groups_collapsed": multi_groups,
+        "conflicting_groups": conflicting_groups,
+        "exact_copy_groups": multi_groups - conflicting_groups,
+    }
+    return resolved, report
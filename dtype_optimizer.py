@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# NUMERIC DTYPE DOWNCASTING
+# ================================================================
+# Integer columns are only ever narrowed from int64 to int32, and only when
+# the observed range fits. int32 is the smallest width that is safe here, not
+# the smallest that holds the values: feature code multiplies raw quantity
+# columns together, and int8/int16 products would silently wrap around.
+_INT_CANDIDATES = (np.int32,)
+
+# Float columns are narrowed to float32 only when no recorded value changes:
+# the column's precision is the fewest decimal places (up to MAX_DECIMALS)
+# that represent every value, and each float32 value must round back to the
+# original at that precision. Computed columns with full float64 precision
+# (no such decimal count) stay float64.
+MAX_DECIMALS = 6
+
+
+def _smallest_int(series):
+    lo, hi = series.min(), series.max()
+    if pd.isna(lo) or pd.isna(hi):
+        return None
+    for candidate in _INT_CANDIDATES:
+        info = np.iinfo(candidate)
+        if info.min <= lo and hi <= info.max:
+            return candidate
+    return None
+
+
+def _decimals(values, max_decimals):
+    """Fewest decimal places that represent every value exactly (None beyond max_decimals)"""
+    for decimals in range(max_decimals + 1):
+        if np.array_equal(np.round(values, decimals), values):
+            return decimals
+    return None
+
+
+def _float32_safe(series, max_decimals):
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return True
+    if np.abs(finite).max() > np.finfo(np.float32).max:
+        return False
+    decimals = _decimals(finite, max_decimals)
+    if decimals is None:
+        return False
+    narrowed = finite.astype(np.float32).astype(np.float64)
+    return np.array_equal(np.round(narrowed, decimals), finite)
+
+
+def optimize_dtypes(df, keep_precision=None, max_decimals=MAX_DECIMALS):
+    """
+    Downcast int64 columns to int32 and float64 columns to float32 where safe.
+
+    int64 becomes int32 when the observed range fits (never narrower, see
+    above), so integer columns are always exact. float32 is used only when
+    every value rounds back to itself at the column's decimal precision (at
+    most max_decimals places, see above). keep_precision: float columns that
+    must stay float64 (e.g. money columns, where float32 rounding would drift
+    totals).
+    Returns (optimized_df, report) where report holds before/after bytes and per-column changes.
+    """
+    keep_precision = set(keep_precision or [])
+    before_bytes = int(df.memory_usage(deep=True, index=True).sum())
+
+    casts = {}
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if dtype == np.int64:
+            target = _smallest_int(series)
+            if target is not None:
+                casts[col] = target
+        elif dtype == np.float64:
+            if col not in keep_precision and _float32_safe(series, max_decimals):
+                casts[col] = np.float32
+
+    changes = []
+    saved = 0
+    for col, target in casts.items():
+        old_nbytes = df[col].memory_usage(index=False, deep=False)
+        new_nbytes = len(df) * np.dtype(target).itemsize
+        saved += old_nbytes - new_nbytes
+        changes.append({
+            "Column": col,
+            "Before": str(df[col].dtype),
+            "After": np.dtype(target).name,
+            "Saved (MB)": round((old_nbytes - new_nbytes) / 1024**2, 2),
+        })
+
+    optimized = df.astype(casts) if casts else df
+    report = {
+        "before_bytes": before_bytes,
+        "after_bytes": before_bytes - int(saved),
+        "changes": changes,
+    }
+    return optimized, report
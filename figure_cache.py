@@ -0,0 +1,110 @@
+import hashlib
+import io
+import pickle
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from dataset_version import derive_token, fingerprint
+
+
+# ================================================================
+# RENDERED FIGURE CACHE
+# ================================================================
+# Charts are drawn by a small function that builds and returns a matplotlib
+# figure. The rendered PNG is cached under (chart id, the values passed as the
+# chart's inputs): DataFrames by their fingerprint, scalars and small
+# containers by value. Callers pass every value the figure depends on; a chart
+# with an input that cannot be tokenised is drawn without caching. On a hit the
+# function is never called, so neither the figure nor its rasterisation is
+# paid again. The cache is shared by every session of the server process and
+# evicts least recently used images beyond its size limit.
+MAX_FIGURES = 256
+MAX_BYTES = 128 * 1024 ** 2
+DPI = 200
+
+
+def _value_token(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return fingerprint(value)
+    if isinstance(value, pd.Index):
+        return hashlib.blake2b(pd.util.hash_pandas_object(value).to_numpy().tobytes(), digest_size=16).hexdigest()
+    if isinstance(value, np.ndarray):
+        return hashlib.blake2b(value.tobytes(), digest_size=16).hexdigest() + str(value.dtype) + str(value.shape)
+    try:
+        return hashlib.blake2b(pickle.dumps(value), digest_size=16).hexdigest()
+    except Exception:
+        return None
+
+
+def figure_key(chart_id, inputs=(), dpi=DPI):
+    """Cache key of a chart, or None when an input cannot be tokenised"""
+    tokens = [_value_token(v) for v in inputs]
+    if any(t is None for t in tokens):
+        return None
+    return derive_token("figure", chart_id, dpi, *tokens)
+
+
+def render_png(fig, dpi=DPI):
+    """Rasterise and close a figure (same defaults as st.pyplot)"""
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+class FigureCache:
+    def __init__(self, max_figures=MAX_FIGURES, max_bytes=MAX_BYTES):
+        self.max_figures = max_figures
+        self.max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            png = self._images.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._images:
+                self._bytes -= len(self._images.pop(key))
+            self._images[key] = png
+            self._bytes += len(png)
+            while self._images and (len(self._images) > self.max_figures or self._bytes > self.max_bytes):
+                _, old = self._images.popitem(last=False)
+                self._bytes -= len(old)
+
+    def render(self, chart_id, draw, inputs=(), dpi=DPI):
+        """
+        PNG bytes for draw(); inputs must hold every value the figure depends
+        on. draw is only called on a cache miss.
+        """
+        key = figure_key(chart_id, inputs, dpi)
+        png = None if key is None else self.get(key)
+        if png is None:
+            png = render_png(draw(), dpi=dpi)
+            if key is not None:
+                self.put(key, png)
+        return png
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+
+# One cache per server process (keys include the data fingerprint, so
+# sessions only ever share images of identical inputs)
+figures = FigureCache()
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# HIERARCHICAL IMPUTATION
+# ================================================================
+# Fill statistics are computed once per dataset version, one vectorized
+# group-by per hierarchy level (product × store → product → category), plus
+# a global median. A missing value takes the statistic of the most specific
+# level whose group has enough observed values, so a missing price is filled
+# from the same product in the same store before falling back to the
+# category or the whole column.
+HIERARCHY = [["product_id", "store_id"], ["product_id"], ["category"]]
+
+# A group statistic is only trusted when it is computed from at least this
+# many non-missing values; smaller groups fall through to the next level
+MIN_GROUP_VALUES = 3
+
+
+def hierarchy_columns(hierarchy=HIERARCHY):
+    """Every key column used by the hierarchy, in first-use order"""
+    return list(dict.fromkeys(k for level in hierarchy for k in level))
+
+
+class FillStatistics:
+    """
+    Per-level fill values for a set of numeric columns.
+
+    levels is a list of (keys, table) from most to least specific, where
+    table is indexed by the key values and has one column per filled column
+    (NaN where the group is too small). fallback is the global statistic.
+    """
+
+    def __init__(self, levels, fallback):
+        self.levels = levels
+        self.fallback = fallback
+
+    @property
+    def columns(self):
+        return list(self.fallback.index)
+
+    def summary(self):
+        """Groups with a usable statistic, per level and column"""
+        data = {" × ".join(keys): table.notna().sum() for keys, table in self.levels}
+        data["Global"] = self.fallback.notna().astype(int)
+        return pd.DataFrame(data).reindex(self.columns)
+
+
+def fill_statistics(df, columns=None, hierarchy=HIERARCHY, min_values=MIN_GROUP_VALUES):
+    """
+    Median fill statistics for the numeric columns of df.
+
+    Levels whose key columns are not all present in df are skipped.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=np.number).columns.tolist()
+    keys_used = set(hierarchy_columns(hierarchy))
+    columns = [c for c in columns if c not in keys_used]
+
+    levels = []
+    for keys in hierarchy:
+        if not columns or any(k not in df.columns for k in keys):
+            continue
+        grouped = df.groupby(keys, observed=True, sort=False)[columns]
+        medians = grouped.median()
+        medians = medians.where(grouped.count() >= min_values)
+        levels.append((list(keys), medians.dropna(how="all").astype(np.float64)))
+    fallback = df[columns].median() if columns else pd.Series(dtype=np.float64)
+    return FillStatistics(levels, fallback.astype(np.float64))
+
+
+def _key_index(keys_df, keys):
+    if len(keys) == 1:
+        return pd.Index(keys_df[keys[0]])
+    return pd.MultiIndex.from_frame(keys_df[keys])
+
+
+def impute(df, stats=None, columns=None, keys=None, report=False):
+    """
+    Fill missing numeric values from hierarchical statistics.
+
+    stats comes from fill_statistics (typically cached per dataset version);
+    columns it does not cover (e.g. features derived after the statistics
+    were computed) get statistics from df itself. keys is an optional frame,
+    aligned with df, holding the hierarchy key columns when df does not (a
+    star-schema fact table, say). With report=True, returns (df, counts)
+    where counts has the number of values filled per column and level.
+    """
+    columns = df.select_dtypes(include=np.number).columns.tolist() if columns is None else list(columns)
+    keys = df if keys is None else keys
+    block = df[columns].to_numpy(dtype=np.float64, na_value=np.nan, copy=True) if columns else np.empty((len(df), 0))
+    missing = np.isnan(block)
+    originally_missing = missing.copy()
+    filled_by = {}
+
+    if missing.any():
+        stat_sources = []
+        covered = [c for c in columns if stats is not None and c in stats.fallback.index]
+        if covered:
+            stat_sources.append((stats, covered))
+        uncovered = [c for c in columns if c not in covered and df[c].isna().any()]
+        if uncovered:
+            extra_keys = [k for k in hierarchy_columns() if k in keys.columns and k not in df.columns]
+            stat_sources.append((fill_statistics(pd.concat([keys[extra_keys], df], axis=1), uncovered), uncovered))
+
+        for source, cols in stat_sources:
+            # Hierarchy key columns themselves are never imputed
+            cols = [c for c in cols if c in source.fallback.index]
+            if not cols:
+                continue
+            idx = np.array([columns.index(c) for c in cols])
+            for level_keys, table in source.levels:
+                if any(k not in keys.columns for k in level_keys):
+                    continue
+                rows = np.flatnonzero(missing[:, idx].any(axis=1))
+                if not rows.size:
+                    break
+                positions = table.index.get_indexer(_key_index(keys.iloc[rows], level_keys))
+                found = positions >= 0
+                rows, positions = rows[found], positions[found]
+                values = table[cols].to_numpy()[positions]
+                take = missing[np.ix_(rows, idx)] & ~np.isnan(values)
+                sub = block[np.ix_(rows, idx)]
+                sub[take] = values[take]
+                block[np.ix_(rows, idx)] = sub
+                missing[np.ix_(rows, idx)] &= ~take
+                filled_by.setdefault(" × ".join(level_keys), {}).update(zip(cols, take.sum(axis=0)))
+            fallback = source.fallback.reindex(cols).to_numpy()
+            sub_missing = missing[:, idx] & ~np.isnan(fallback)
+            block[:, idx] = np.where(sub_missing, fallback, block[:, idx])
+            missing[:, idx] &= ~sub_missing
+            filled_by.setdefault("Global", {}).update(zip(cols, sub_missing.sum(axis=0)))
+
+    # Only columns that had gaps are written back; float columns keep their
+    # precision, everything else becomes float64 like a fractional fillna would
+    out = df.copy(deep=False)
+    for i in np.flatnonzero(originally_missing.any(axis=0)):
+        col = columns[i]
+        dtype = df[col].dtype
+        out[col] = block[:, i].astype(dtype) if dtype.kind == "f" else block[:, i]
+
+    if not report:
+        return out
+    counts = pd.DataFrame(filled_by).reindex(columns).fillna(0).astype(int)
+    return out, counts
@@ -0,0 +1,164 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# TEXT → NUMERIC COERCION (CURRENCY, SEPARATORS, UNITS, PERCENTAGES)
+# ================================================================
+# Columns are parsed per *distinct value* (categories, or a factorize of the
+# strings), so a 2M-row column with a few thousand distinct strings costs a
+# few thousand regex matches. The number format (thousands separator /
+# decimal mark) is inferred from a sample of distinct values first.
+SAFE_NUMERIC_PATTERNS = [
+    'quantity', 'amount', 'price', 'sales', 'cost', 'revenue',
+    'score', 'rating', 'count', 'total', 'sum', 'discount',
+    'tax', 'forecast', 'weight', 'height', 'length', 'width'
+]
+
+ID_PATTERNS = ['id', 'code', 'key', 'identifier', 'number']
+
+# Placeholders that mean "no value" rather than "unparseable value"
+NA_TOKENS = {"", "na", "n/a", "n.a.", "nan", "null", "none", "nil", "-", "--", "?", "#n/a", "unknown"}
+
+MIN_PARSE_RATE = 0.8
+SAMPLE_VALUES = 1000
+
+# Optional currency / text prefix (₹, $, Rs., USD, ...), the number itself,
+# then an optional % or unit suffix (units, kg, pcs, ...). Parentheses mark
+# accounting negatives. Applied after separators are normalised.
+_NUMBER_RE = re.compile(
+    r"^(?P<open>\()?\s*"
+    r"(?P<prefix>[^\d\s.+\-()]{1,4}\.?)?\s*"
+    r"(?P<num>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*"
+    r"(?P<suffix>%|[^\d\s()+\-.,][^\d()]{0,15})?\s*"
+    r"(?P<close>\))?$"
+)
+_EU_GROUPED = re.compile(r"\d{1,3}(?:\.\d{3})+(?:,\d+)?")
+_EU_DECIMAL = re.compile(r"^[^\d]*\d+,\d{1,2}(?:[^\d]|$)")
+_US_GROUPED = re.compile(r"\d{1,3}(?:,\d{3})+(?:\.\d+)?")
+
+
+def candidate_columns(df):
+    """Non-numeric, non-ID columns whose names suggest a measurable quantity"""
+    columns = []
+    for col in df.columns:
+        col_lower = str(col).lower()
+        if any(pattern in col_lower for pattern in ID_PATTERNS) or pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if any(pattern in col_lower for pattern in SAFE_NUMERIC_PATTERNS):
+            columns.append(col)
+    return columns
+
+
+def _distinct_strings(series):
+    """(codes, distinct values as a str Series); codes are -1 for missing"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), pd.Series(series.cat.categories.astype(str))
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Series(pd.Index(uniques).astype(str))
+
+
+def infer_format(values):
+    """
+    Number format of a sample of distinct strings:
+    {"thousands", "decimal", "currency", "unit", "percent"}.
+    """
+    sample = pd.Series(values, dtype=object).dropna().astype(str).str.strip()
+    sample = sample[~sample.str.lower().isin(NA_TOKENS)]
+    eu = sample.str.contains(_EU_GROUPED).sum() + sample.str.contains(_EU_DECIMAL).sum()
+    us = sample.str.contains(_US_GROUPED).sum()
+    decimal, thousands = (",", ".") if eu > us else (".", ",")
+
+    matched = _normalise(sample, thousands, decimal).str.extract(_NUMBER_RE)
+    prefixes = matched["prefix"].dropna()
+    suffixes = matched["suffix"].dropna().str.strip()
+    return {
+        "thousands": thousands,
+        "decimal": decimal,
+        "currency": prefixes.mode().iloc[0] if not prefixes.empty else None,
+        "unit": suffixes[suffixes != "%"].mode().iloc[0] if (suffixes != "%").any() else None,
+        "percent": bool((suffixes == "%").mean() > 0.5) if not suffixes.empty else False,
+    }
+
+
+def _normalise(strings, thousands, decimal):
+    strings = strings.str.strip().str.replace(thousands, "", regex=False)
+    if decimal != ".":
+        strings = strings.str.replace(decimal, ".", regex=False)
+    return strings
+
+
+def parse_strings(strings, fmt):
+    """
+    Parse distinct strings with one vectorized regex pass.
+    Returns (values float64 array, missing mask) – missing marks NA tokens.
+    """
+    strings = pd.Series(strings, dtype=object).astype(str)
+    missing = strings.str.strip().str.lower().isin(NA_TOKENS).to_numpy()
+    matched = _normalise(strings, fmt["thousands"], fmt["decimal"]).str.extract(_NUMBER_RE)
+    values = pd.to_numeric(matched["num"], errors="coerce").to_numpy(dtype=np.float64)
+    # "(1,234)" is an accounting negative; an unbalanced parenthesis is not a number
+    opened, closed = matched["open"].notna().to_numpy(), matched["close"].notna().to_numpy()
+    values = np.where(opened & closed, -values, values)
+    values[opened != closed] = np.nan
+    values[missing] = np.nan
+    return values, missing
+
+
+def coerce_numeric(series, fmt=None, sample_values=SAMPLE_VALUES):
+    """
+    Convert a text column to float64.
+
+    Returns (numeric Series, stats) where stats has the inferred format and
+    parse counts: parse_rate is parsed / non-missing values (NA placeholders
+    such as "N/A" count as missing, not as failures).
+    """
+    codes, distinct = _distinct_strings(series)
+    if fmt is None:
+        fmt = infer_format(distinct.iloc[:sample_values])
+    values, missing = parse_strings(distinct, fmt)
+
+    present = codes >= 0
+    row_values = np.full(len(series), np.nan)
+    row_values[present] = values[codes[present]]
+    row_missing = ~present
+    row_missing[present] |= missing[codes[present]]
+
+    parsed = int((~np.isnan(row_values)).sum())
+    non_missing = int((~row_missing).sum())
+    failed_distinct = distinct[~missing & np.isnan(values)]
+    stats = {
+        "format": fmt,
+        "rows": int(len(series)),
+        "missing": int(row_missing.sum()),
+        "parsed": parsed,
+        "failed": non_missing - parsed,
+        "parse_rate": parsed / non_missing if non_missing else 0.0,
+        "failed_examples": failed_distinct.head(5).tolist(),
+    }
+    return pd.Series(row_values, index=series.index, name=series.name), stats
+
+
+def parse_report(df, columns=None):
+    """Per-column parse rates for text columns that look numeric (cheap: distinct values only)"""
+    columns = candidate_columns(df) if columns is None else list(columns)
+    rows = []
+    for col in columns:
+        _, stats = coerce_numeric(df[col])
+        fmt = stats["format"]
+        rows.append({
+            "Column": col,
+            "Format": ", ".join(filter(None, [
+                fmt["currency"] and f"currency {fmt['currency']}",
+                fmt["unit"] and f"unit '{fmt['unit']}'",
+                fmt["percent"] and "percent",
+                f"thousands '{fmt['thousands']}' / decimal '{fmt['decimal']}'",
+            ])),
+            "Parsed %": round(100 * stats["parse_rate"], 2),
+            "Missing": stats["missing"],
+            "Unparseable": stats["failed"],
+            "Examples": ", ".join(map(repr, stats["failed_examples"])),
+        })
+    return pd.DataFrame(rows, columns=["Column", "Format", "Parsed %", "Missing", "Unparseable", "Examples"])
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# VECTORIZED IQR OUTLIER ENGINE
+# ================================================================
+# All numeric columns are handled as one 2-D float64 block: quartiles come
+# from a single batched quantile call per block (or per group slice), and the
+# mild / extreme masks and clipping are element-wise operations against
+# per-column bound vectors.
+QUARTILES = (0.25, 0.75)
+MILD_IQR = 1.5
+EXTREME_IQR = 2.0
+# A row is removed when its score reaches this: 1 per mild outlier column,
+# 2 more per extreme outlier in a column marked for deletion
+REMOVE_SCORE = 4
+
+
+def numeric_columns(df):
+    return df.select_dtypes(include=np.number).columns.tolist()
+
+
+def numeric_block(df, columns):
+    """(rows, columns) float64 array; nullable / integer columns become float with NaN"""
+    if not columns:
+        return np.empty((len(df), 0), dtype=np.float64)
+    return df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def column_quartiles(block):
+    """
+    (2, columns) array of Q1 / Q3, NaNs skipped.
+
+    Uses the same linear interpolation as Series.quantile, so bounds are
+    bit-identical to the per-column pandas calls.
+    """
+    q = np.full((2, block.shape[1]), np.nan)
+    if len(block):
+        # One row per column, so the selection runs over contiguous memory
+        columns = np.ascontiguousarray(block.T)
+        has_nan = np.isnan(columns).any(axis=1)
+        if (~has_nan).any():
+            q[:, ~has_nan] = np.quantile(columns[~has_nan], QUARTILES, axis=1)
+        for i in np.flatnonzero(has_nan):
+            values = columns[i][~np.isnan(columns[i])]
+            if values.size:
+                q[:, i] = np.quantile(values, QUARTILES)
+    return q
+
+
+def iqr_bounds(q1, q3, k):
+    iqr = q3 - q1
+    return q1 - k * iqr, q3 + k * iqr
+
+
+def _row_groups(df, group_by):
+    """[(label, row positions)], or a single whole-frame group when group_by is None"""
+    if group_by is None:
+        return [("All rows", slice(None))]
+    keys = [group_by] if isinstance(group_by, str) else list(group_by)
+    missing = [k for k in keys if k not in df.columns]
+    if missing:
+        raise KeyError(f"Group columns not found: {missing}")
+    codes, labels = pd.factorize(
+        pd.MultiIndex.from_frame(df[keys]) if len(keys) > 1 else df[keys[0]],
+        use_na_sentinel=False,
+    )
+    # One stable ordering by group, then contiguous slices of it
+    order = np.argsort(codes, kind="stable")
+    edges = np.searchsorted(codes[order], np.arange(len(labels) + 1))
+    return [(labels[g], order[edges[g]:edges[g + 1]]) for g in range(len(labels))]
+
+
+def _scan(block, delete_idx, groups, fixed_quartiles=None):
+    """Per-group bounds, mild-outlier mask, removal score and clipped block"""
+    mild = np.zeros(block.shape, dtype=bool)
+    score = np.zeros(len(block), dtype=np.int64)
+    clipped = np.empty_like(block)
+    bounds = []
+    for label, rows in groups:
+        sub = block[rows]
+        q1, q3 = column_quartiles(sub) if fixed_quartiles is None else fixed_quartiles
+        mild_lower, mild_upper = iqr_bounds(q1, q3, MILD_IQR)
+        extreme_lower, extreme_upper = iqr_bounds(q1, q3, EXTREME_IQR)
+        with np.errstate(invalid="ignore"):
+            sub_mild = (sub < mild_lower) | (sub > mild_upper)
+            sub_score = sub_mild.sum(axis=1)
+            if delete_idx:
+                d = sub[:, delete_idx]
+                sub_score += 2 * ((d < extreme_lower[delete_idx]) | (d > extreme_upper[delete_idx])).sum(axis=1)
+        mild[rows] = sub_mild
+        score[rows] = sub_score
+        # NaN bounds (all-NaN column) must leave values untouched
+        clipped[rows] = np.clip(sub, np.nan_to_num(mild_lower, nan=-np.inf), np.nan_to_num(mild_upper, nan=np.inf))
+        bounds.append((label, q1, q3, mild_lower, mild_upper, extreme_lower, extreme_upper))
+    return bounds, mild, score, clipped
+
+
+def _bounds_frame(bounds, columns):
+    return pd.DataFrame([
+        {"Group": label, "Column": col, "Q1": q1[i], "Q3": q3[i],
+         "Lower": ml[i], "Upper": mu[i], "Extreme Lower": el[i], "Extreme Upper": eu[i]}
+        for label, q1, q3, ml, mu, el, eu in bounds
+        for i, col in enumerate(columns)
+    ], columns=["Group", "Column", "Q1", "Q3", "Lower", "Upper", "Extreme Lower", "Extreme Upper"])
+
+
+def _sketch_quartiles(sketch, columns, group_by):
+    if sketch is None:
+        return None
+    if group_by is not None:
+        raise ValueError("Sketch quartiles are whole-dataset; they cannot be combined with group_by")
+    return sketch.quartiles(columns)
+
+
+def outlier_bounds(df, group_by=None, columns=None, sketch=None):
+    """
+    Q1 / Q3 and mild / extreme bounds per (group, column), for display.
+    With a sketch and df=None, bounds come from the sketch alone (no rows needed).
+    """
+    if df is None:
+        columns = list(columns) if columns is not None else list(sketch.columns)
+        q1, q3 = _sketch_quartiles(sketch, columns, group_by)
+        ml, mu = iqr_bounds(q1, q3, MILD_IQR)
+        el, eu = iqr_bounds(q1, q3, EXTREME_IQR)
+        return _bounds_frame([("All rows", q1, q3, ml, mu, el, eu)], columns)
+    columns = numeric_columns(df) if columns is None else list(columns)
+    bounds, _, _, _ = _scan(numeric_block(df, columns), [], _row_groups(df, group_by),
+                            _sketch_quartiles(sketch, columns, group_by))
+    return _bounds_frame(bounds, columns)
+
+
+def remove_outliers(df, delete_cols=(), group_by=None, columns=None, sketch=None):
+    """
+    IQR outlier treatment over every numeric column at once.
+
+    Values outside Q1 - 1.5·IQR / Q3 + 1.5·IQR are clipped to those bounds; rows
+    whose score (one point per mild outlier column, two more per extreme
+    2.0·IQR outlier in a delete_cols column) reaches 4 are removed. group_by
+    (a column or list of columns, e.g. "category" or "store_type") computes the
+    bounds within each group instead of over the whole column. sketch (a
+    quantile_sketch.FrameSketch, e.g. from data_cache.read_sketches) supplies
+    approximate whole-dataset quartiles instead of exact ones, so a chunk can be
+    treated against the bounds of data larger than memory.
+
+    Returns (before_df, after_df, removed_df); without group_by these match the
+    per-column loop this replaces exactly, dtypes included.
+    """
+    columns = numeric_columns(df) if columns is None else list(columns)
+    block = numeric_block(df, columns)
+    delete_cols = set(delete_cols)
+    delete_idx = [i for i, c in enumerate(columns) if c in delete_cols]
+
+    bounds, mild, score, clipped = _scan(block, delete_idx, _row_groups(df, group_by),
+                                         _sketch_quartiles(sketch, columns, group_by))
+
+    # Only columns that actually change are written back. float64 columns take
+    # the clipped block directly; other dtypes go through Series.clip with the
+    # global bounds so they get exactly the dtype pandas would give them
+    # (e.g. int → float64 for fractional bounds).
+    after_df = df.copy(deep=False)
+    for i in np.flatnonzero(mild.any(axis=0)):
+        col = columns[i]
+        dtype = df[col].dtype
+        if group_by is None and dtype != np.float64:
+            _, _, _, mild_lower, mild_upper, _, _ = bounds[0]
+            after_df[col] = df[col].clip(mild_lower[i], mild_upper[i])
+        else:
+            after_df[col] = clipped[:, i].astype(dtype) if dtype.kind == "f" else clipped[:, i]
+
+    extreme_mask = score >= REMOVE_SCORE
+    removed_df = df[extreme_mask]
+    after_df = after_df[~extreme_mask].reset_index(drop=True)
+    return df, after_df, removed_df
@@ -0,0 +1,166 @@
+import json
+
+import pandas as pd
+
+from dataset_version import derive_token, fingerprint, stamp
+
+
+# ================================================================
+# REPLAYABLE PRE-PROCESSING PIPELINE
+# ================================================================
+# The pipeline records *what* was applied (operation name + parameters, in
+# order) rather than keeping every intermediate frame. The loaded frame is
+# the base; the current frame and a few recent checkpoints are the only other
+# frames held. Undo, removal and reordering replay the recorded steps from
+# the nearest surviving checkpoint – cheap when the operations are cached by
+# input fingerprint (dataset_version.cache_frames), since a replayed step
+# with an unchanged input is a cache hit.
+
+
+class PipelineStep:
+    def __init__(self, op, params=None, label=None):
+        self.op = op
+        self.params = dict(params or {})
+        self.label = label or op
+        self.report = None
+        self.rows_after = None
+
+    def spec(self):
+        return {"op": self.op, "params": self.params}
+
+
+class PreprocessPipeline:
+    """
+    Ordered pre-processing steps over a base (frame, dimensions) state.
+
+    operations maps an op name to fn(df, dimensions, **params) returning
+    (df, dimensions, report). Frames are treated as immutable: an operation
+    returns a new frame (or the same one when nothing changed).
+    """
+
+    def __init__(self, base, dimensions=None, operations=None, max_checkpoints=2):
+        self.operations = dict(operations or {})
+        self.max_checkpoints = max_checkpoints
+        self.steps = []
+        self._checkpoints = {0: (base, dimensions)}
+
+    # -- state ----------------------------------------------------
+    @property
+    def base(self):
+        return self._checkpoints[0]
+
+    @property
+    def current(self):
+        """(df, dimensions) after every recorded step"""
+        return self.state_at(len(self.steps))
+
+    def state_at(self, position):
+        """State after the first `position` steps, replayed from the nearest checkpoint"""
+        start = max(p for p in self._checkpoints if p <= position)
+        df, dimensions = self._checkpoints[start]
+        for i in range(start, position):
+            df, dimensions = self._run(i, df, dimensions)
+        return df, dimensions
+
+    def _replay(self):
+        return self.state_at(len(self.steps))
+
+    def _run(self, i, df, dimensions):
+        step = self.steps[i]
+        token = derive_token("pipeline", step.op, sorted(step.params.items()), fingerprint(df))
+        out, dimensions, step.report = self.operations[step.op](df, dimensions, **step.params)
+        if out is not df:
+            # Outputs carry a token derived from the input's, so later cached
+            # steps and replays never content-hash them
+            stamp(out, token)
+        df = out
+        step.rows_after = len(df)
+        self._checkpoint(i + 1, df, dimensions)
+        return df, dimensions
+
+    def _checkpoint(self, position, df, dimensions):
+        self._checkpoints[position] = (df, dimensions)
+        # Keep the base plus the most recent few positions
+        recent = sorted((p for p in self._checkpoints if p), reverse=True)
+        for p in recent[self.max_checkpoints:]:
+            del self._checkpoints[p]
+
+    def _invalidate_from(self, position):
+        """Drop checkpoints that depend on steps at or after `position`"""
+        for p in [p for p in self._checkpoints if p > position]:
+            del self._checkpoints[p]
+
+    # -- editing --------------------------------------------------
+    def add(self, op, label=None, **params):
+        """Apply a new step to the current state; returns its report"""
+        if op not in self.operations:
+            raise KeyError(f"Unknown pre-processing operation {op!r}")
+        df, dimensions = self._replay()
+        self.steps.append(PipelineStep(op, params, label))
+        self._run(len(self.steps) - 1, df, dimensions)
+        return self.steps[-1].report
+
+    def undo(self):
+        """Remove the last step; returns it (None when there is nothing to undo)"""
+        if not self.steps:
+            return None
+        return self.remove(len(self.steps) - 1)
+
+    def remove(self, index):
+        step = self.steps.pop(index)
+        self._invalidate_from(index)
+        self._replay()
+        return step
+
+    def move(self, index, new_index):
+        """Reorder a step and replay everything from the first position that changed"""
+        new_index = max(0, min(new_index, len(self.steps) - 1))
+        if new_index == index:
+            return
+        self.steps.insert(new_index, self.steps.pop(index))
+        self._invalidate_from(min(index, new_index))
+        self._replay()
+
+    def reset(self):
+        self.steps = []
+        self._invalidate_from(0)
+
+    def rebase(self, base, dimensions=None):
+        """Swap in a new base (e.g. after an incremental refresh) and replay every step"""
+        self._checkpoints = {0: (base, dimensions)}
+        return self._replay()
+
+    def has(self, op):
+        return any(step.op == op for step in self.steps)
+
+    def report(self, op):
+        """Report of the latest step of this operation, or None"""
+        for step in reversed(self.steps):
+            if step.op == op:
+                return step.report
+        return None
+
+    # -- reproducibility ------------------------------------------
+    def describe(self):
+        return pd.DataFrame([
+            {
+                "#": i + 1,
+                "Step": step.label,
+                "Parameters": ", ".join(f"{k}={v}" for k, v in step.params.items()) or "–",
+                "Rows After": step.rows_after,
+            }
+            for i, step in enumerate(self.steps)
+        ], columns=["#", "Step", "Parameters", "Rows After"])
+
+    def to_json(self):
+        return json.dumps([step.spec() for step in self.steps], indent=2, default=str)
+
+    def load_spec(self, spec, labels=None):
+        """Replace the steps with a saved spec (list of {"op", "params"}) and replay them"""
+        steps = json.loads(spec) if isinstance(spec, str) else spec
+        unknown = [s["op"] for s in steps if s["op"] not in self.operations]
+        if unknown:
+            raise KeyError(f"Unknown pre-processing operation(s): {unknown}")
+        self.steps = [PipelineStep(s["op"], s.get("params"), (labels or {}).get(s["op"])) for s in steps]
+        self._invalidate_from(0)
+        return self._replay()
@@ -0,0 +1,279 @@
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# PER-SESSION MEMORY BUDGET WITH DISK SPILL
+# ================================================================
+# Large results (model outputs, optimisation tables, fitted models) are kept
+# in a SessionStore instead of directly in st.session_state. The store knows
+# the size of everything registered with it; when the session goes over its
+# budget, the least recently used entries are written to a spill directory
+# and dropped from memory. Spilled frames are stored column by column as
+# .npy files and come back memory-mapped, so reading a spilled frame costs
+# page cache rather than heap; other objects are pickled. The maps are
+# copy-on-write: a reloaded frame can be written to like any other, the
+# written pages become private memory and the spill file is never changed.
+DEFAULT_BUDGET_MB = 512
+SPILL_ROOT = os.path.join(tempfile.gettempdir(), "supplysync_spill")
+
+IN_MEMORY = "In memory"
+MAPPED = "Memory-mapped"
+SPILLED = "Spilled to disk"
+
+
+def object_size(value):
+    """
+    Approximate heap bytes held by a value: deep for frames, summed over the
+    items of dicts / lists / tuples, pickled size for anything else
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if value is None or isinstance(value, (str, bytes, int, float)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sum(object_size(k) + object_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(object_size(v) for v in value)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+def _mappable(series):
+    dtype = series.dtype
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufmM"
+
+
+def _is_mapped(values):
+    while values is not None:
+        if isinstance(values, np.memmap):
+            return True
+        values = getattr(values, "base", None)
+    return False
+
+
+def _heap_size(df):
+    """Bytes of a reloaded frame that are not backed by a memory map"""
+    return sum(
+        int(df.iloc[:, i].memory_usage(deep=True, index=False))
+        for i in range(df.shape[1]) if not _is_mapped(df.iloc[:, i].to_numpy())
+    ) + int(df.index.memory_usage(deep=True))
+
+
+def _write_frame(path, df):
+    """One .npy per plain numeric / datetime column; everything else in a pickled meta file"""
+    is_series = isinstance(df, pd.Series)
+    if is_series:
+        df = df.to_frame()
+    os.makedirs(path, exist_ok=True)
+    mapped, other = {}, {}
+    for i, col in enumerate(df.columns):
+        series = df.iloc[:, i]
+        if _mappable(series):
+            name = f"c{i}.npy"
+            np.save(os.path.join(path, name), series.to_numpy())
+            mapped[i] = name
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            # Codes map; the (small) categories go with the metadata
+            name = f"c{i}.npy"
+            np.save(os.path.join(path, name), series.cat.codes.to_numpy())
+            mapped[i] = name
+            other[i] = series.dtype
+        else:
+            other[i] = series
+    meta = {"columns": list(df.columns), "index": df.index, "mapped": mapped, "other": other,
+            "series": is_series}
+    with open(os.path.join(path, "meta.pkl"), "wb") as fh:
+        pickle.dump(meta, fh, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_frame(path):
+    with open(os.path.join(path, "meta.pkl"), "rb") as fh:
+        meta = pickle.load(fh)
+    data = {}
+    for i in range(len(meta["columns"])):
+        if i in meta["mapped"]:
+            values = np.load(os.path.join(path, meta["mapped"][i]), mmap_mode="c")
+            if i in meta["other"]:
+                values = pd.Categorical.from_codes(values, dtype=meta["other"][i])
+            data[i] = pd.Series(values, index=meta["index"], copy=False)
+        else:
+            data[i] = meta["other"][i]
+    df = pd.DataFrame(data, index=meta["index"], copy=False)
+    df.columns = meta["columns"]
+    return df.iloc[:, 0] if meta["series"] else df
+
+
+class _Entry:
+    def __init__(self, value, size=None):
+        self.value = value
+        self._size = size
+        self.kind = type(value).__name__
+        self.state = IN_MEMORY
+        self.path = None
+        self.last_used = time.time()
+
+    @property
+    def size(self):
+        # Measured the first time a budget decision or report needs it
+        if self._size is None:
+            self._size = object_size(self.value)
+        return self._size
+
+    @size.setter
+    def size(self, size):
+        self._size = size
+
+
+class SessionStore:
+    """
+    Dict-like store with a memory budget for one browser session.
+
+    Assigning registers a value and its size; reading marks it as recently
+    used and transparently reloads it when it was spilled. Keep one store per
+    session in st.session_state; its spill directory is removed when the
+    store is garbage collected (i.e. when the session ends).
+    """
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB, spill_root=SPILL_ROOT):
+        self.budget_bytes = int(budget_mb * 1024 ** 2)
+        self.spill_dir = os.path.join(spill_root, uuid.uuid4().hex)
+        self._entries = OrderedDict()
+        self.spill_count = 0
+        weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    # -- mapping interface ----------------------------------------
+    def __setitem__(self, key, value):
+        # Re-assigning an object the store already holds reuses its measured size
+        size = next((e._size for e in self._entries.values() if e.value is value), None)
+        if key in self._entries:
+            del self[key]
+        self._entries[key] = _Entry(value, size)
+        self._enforce(keep=key)
+
+    def __getitem__(self, key):
+        entry = self._entries[key]
+        if entry.state == SPILLED:
+            self._reload(entry)
+        entry.last_used = time.time()
+        self._entries.move_to_end(key)
+        self._enforce(keep=key)
+        return entry.value
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __delitem__(self, key):
+        entry = self._entries.pop(key)
+        if entry.path:
+            self._remove_spill(entry.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        return self[key] if key in self._entries else default
+
+    def pop(self, key, default=None):
+        if key not in self._entries:
+            return default
+        value = self[key]
+        del self[key]
+        return value
+
+    def keys(self):
+        return list(self._entries)
+
+    def clear(self):
+        for key in list(self._entries):
+            del self[key]
+
+    # -- budget ---------------------------------------------------
+    @property
+    def resident_bytes(self):
+        return sum(e.size for e in self._entries.values() if e.state != SPILLED)
+
+    @property
+    def spilled_bytes(self):
+        return sum(e.size for e in self._entries.values() if e.state == SPILLED)
+
+    def _enforce(self, keep=None):
+        """Spill least recently used entries until the session is within budget"""
+        resident = self.resident_bytes
+        for key in list(self._entries):
+            if resident <= self.budget_bytes:
+                return
+            entry = self._entries[key]
+            if key == keep or entry.state != IN_MEMORY or entry.size == 0:
+                continue
+            self._spill(key, entry)
+            if entry.state == SPILLED:
+                resident -= entry.size
+
+    def _spill(self, key, entry):
+        path = os.path.join(self.spill_dir, uuid.uuid4().hex)
+        try:
+            if isinstance(entry.value, (pd.DataFrame, pd.Series)):
+                _write_frame(path, entry.value)
+            else:
+                os.makedirs(path, exist_ok=True)
+                with open(os.path.join(path, "value.pkl"), "wb") as fh:
+                    pickle.dump(entry.value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Unpicklable values simply stay in memory
+            self._remove_spill(path)
+            return
+        entry.path = path
+        entry.value = None
+        entry.state = SPILLED
+        self.spill_count += 1
+
+    def _reload(self, entry):
+        if os.path.exists(os.path.join(entry.path, "meta.pkl")):
+            entry.value = _read_frame(entry.path)
+            entry.state = MAPPED
+            # Only the non-mapped part of a reloaded frame counts against the budget
+            frame = entry.value.to_frame() if isinstance(entry.value, pd.Series) else entry.value
+            entry.size = _heap_size(frame)
+        else:
+            with open(os.path.join(entry.path, "value.pkl"), "rb") as fh:
+                entry.value = pickle.load(fh)
+            entry.state = IN_MEMORY
+            self._remove_spill(entry.path)
+            entry.path = None
+
+    @staticmethod
+    def _remove_spill(path):
+        shutil.rmtree(path, ignore_errors=True)
+
+    # -- reporting ------------------------------------------------
+    def usage(self):
+        """One row per registered entry, most recently used first"""
+        now = time.time()
+        rows = [
+            {
+                "Key": key,
+                "Type": e.kind,
+                "Size (MB)": round(e.size / 1024 ** 2, 2),
+                "State": e.state,
+                "Idle (s)": round(now - e.last_used),
+            }
+            for key, e in reversed(self._entries.items())
+        ]
+        return pd.DataFrame(rows, columns=["Key", "Type", "Size (MB)", "State", "Idle (s)"])
@@ -0,0 +1,141 @@
+import threading
+import weakref
+
+import pandas as pd
+
+from dataset_version import derive_token, fingerprint, stamp
+
+
+# ================================================================
+# PROCESS-WIDE SHARED DATASETS
+# ================================================================
+# Sessions that load the same data hold one copy between them. The registry
+# keeps each distinct dataset once, keyed by its fingerprint, and hands every
+# session a shallow view of it. pandas copy-on-write (always on from pandas
+# 3.0, which requirements.txt pins) makes the views safe to share: a session
+# that modifies its frame (a pre-processing step, a new column) gets its own
+# copy of just what it changed, and the shared data is never written. Each
+# view holds a reference; when the last session releases its view (or the
+# session ends and the view is garbage collected) the dataset is dropped.
+
+
+def _view(df):
+    view = df.copy(deep=False)
+    stamp(view, fingerprint(df))
+    return view
+
+
+def _view_dimensions(dimensions):
+    if not dimensions:
+        return dimensions
+    return {name: {**d, "table": _view(d["table"])} for name, d in dimensions.items()}
+
+
+class _SharedEntry:
+    def __init__(self, token, frame, dimensions, meta):
+        self.token = token
+        self.frame = frame
+        self.dimensions = dimensions
+        self.meta = meta
+        self.refs = 0
+        self.aliases = set()
+        self._size = None
+
+    @property
+    def size(self):
+        if self._size is None:
+            self._size = int(self.frame.memory_usage(deep=True).sum()) + sum(
+                int(d["table"].memory_usage(deep=True).sum()) for d in (self.dimensions or {}).values()
+            )
+        return self._size
+
+
+class SharedDataset:
+    """
+    One session's handle on a shared dataset.
+
+    frame / dimensions are views of the shared data; meta is whatever was
+    registered with it (e.g. the load-time memory report). Keep the handle in
+    st.session_state and call release() when the session switches datasets.
+    """
+
+    def __init__(self, registry, entry):
+        self.token = entry.token
+        self.frame = _view(entry.frame)
+        self.dimensions = _view_dimensions(entry.dimensions)
+        self.meta = entry.meta
+        self._release = weakref.finalize(self, registry._release, entry.token)
+
+    def release(self):
+        self._release()
+
+    @property
+    def released(self):
+        return not self._release.alive
+
+
+class DatasetRegistry:
+    def __init__(self):
+        # Re-entrant: a handle can be garbage collected (and release) while the lock is held
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._aliases = {}
+
+    @staticmethod
+    def dataset_token(df, dimensions=None):
+        dim_tokens = [(name, fingerprint(d["table"])) for name, d in sorted((dimensions or {}).items())]
+        return derive_token("shared_dataset", fingerprint(df), *dim_tokens)
+
+    def share(self, df, dimensions=None, alias=None, meta=None):
+        """
+        Register a loaded dataset (or find the identical one already shared)
+        and return a handle on it. alias (e.g. the load parameters) lets other
+        sessions attach() without loading the data again.
+        """
+        token = self.dataset_token(df, dimensions)
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                entry = self._entries[token] = _SharedEntry(token, df, dimensions, dict(meta or {}))
+            if alias is not None:
+                self._aliases[alias] = token
+                entry.aliases.add(alias)
+            entry.refs += 1
+            return SharedDataset(self, entry)
+
+    def attach(self, alias):
+        """Handle on the dataset registered under alias, or None when there is none"""
+        with self._lock:
+            entry = self._entries.get(self._aliases.get(alias))
+            if entry is None:
+                return None
+            entry.refs += 1
+            return SharedDataset(self, entry)
+
+    def _release(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs <= 0:
+                del self._entries[token]
+                for alias in entry.aliases:
+                    if self._aliases.get(alias) == token:
+                        del self._aliases[alias]
+
+    def usage(self):
+        """One row per shared dataset"""
+        with self._lock:
+            entries = list(self._entries.values())
+        rows = [
+            {"Dataset": e.token[:12], "Rows": len(e.frame),
+             "Size (MB)": round(e.size / 1024 ** 2, 1), "Sessions": e.refs}
+            for e in entries
+        ]
+        return pd.DataFrame(rows, columns=["Dataset", "Rows", "Size (MB)", "Sessions"])
+
+
+# One registry per server process; Streamlit imports this module once and
+# every session's script run sees the same instance
+registry = DatasetRegistry()
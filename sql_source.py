@@ -0,0 +1,141 @@
+import re
+import sqlite3
+
+import pandas as pd
+
+try:
+    from mysql.connector import pooling as mysql_pooling
+except Exception:
+    mysql_pooling = None
+
+
+# ================================================================
+# SQL INGESTION SOURCE (MySQL / SQLite STAND-IN)
+# ================================================================
+DEFAULT_BATCH_SIZE = 50_000
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def quote_identifier(name):
+    """Backtick-quote a column/table name (accepted by both MySQL and SQLite)"""
+    if not _IDENTIFIER_RE.match(str(name)):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return f"`{name}`"
+
+
+class SQLSource:
+    """
+    Streams a fact table out of a DB-API connection in fixed-size batches.
+
+    `connect` is any zero-argument callable returning a DB-API connection;
+    closing that connection hands it back to the pool when it came from one.
+    Column lists and date windows are pushed down into the SELECT.
+    """
+
+    def __init__(self, connect, table, paramstyle="pyformat", date_column="date",
+                 batch_size=DEFAULT_BATCH_SIZE, cursor_kwargs=None):
+        self.connect = connect
+        self.table = table
+        self.paramstyle = paramstyle
+        self.date_column = date_column
+        self.batch_size = batch_size
+        self.cursor_kwargs = cursor_kwargs or {}
+
+    def _placeholder(self):
+        return "?" if self.paramstyle == "qmark" else "%s"
+
+    def build_query(self, columns=None, date_from=None, date_to=None, date_after=None):
+        """SELECT with projection, a half-open [date_from, date_to) window and an
+        optional strict lower bound (date_after) used for watermark refreshes"""
+        select = "*" if not columns else ", ".join(quote_identifier(c) for c in columns)
+        sql = f"SELECT {select} FROM {quote_identifier(self.table)}"
+
+        clauses, params = [], []
+        date_col = quote_identifier(self.date_column)
+        if date_from is not None:
+            clauses.append(f"{date_col} >= {self._placeholder()}")
+            params.append(str(date_from))
+        if date_to is not None:
+            clauses.append(f"{date_col} < {self._placeholder()}")
+            params.append(str(date_to))
+        if date_after is not None:
+            clauses.append(f"{date_col} > {self._placeholder()}")
+            params.append(str(date_after))
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return sql, tuple(params)
+
+    def watermark(self):
+        """Latest value of the date column (None for an empty table)"""
+        sql = f"SELECT MAX({quote_identifier(self.date_column)}) FROM {quote_identifier(self.table)}"
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+        return rows[0][0] if rows else None
+
+    def iter_batches(self, columns=None, date_from=None, date_to=None, date_after=None):
+        """Yield pandas DataFrames of at most batch_size rows"""
+        sql, params = self.build_query(columns, date_from, date_to, date_after)
+        conn = self.connect()
+        try:
+            cursor = conn.cursor(**self.cursor_kwargs)
+            try:
+                cursor.execute(sql, params)
+                names = [d[0] for d in cursor.description]
+                while True:
+                    rows = cursor.fetchmany(self.batch_size)
+                    if not rows:
+                        break
+                    yield pd.DataFrame.from_records(rows, columns=names)
+            finally:
+                cursor.close()
+        finally:
+            conn.close()
+
+    def read_frame(self, columns=None, date_from=None, date_to=None, dtype_spec=None,
+                   date_after=None, progress=None):
+        """Concatenate all batches and apply the loader's dtype spec.
+        progress, if given, is called as progress(rows, None, None) after each batch"""
+        batches, rows = [], 0
+        for batch in self.iter_batches(columns, date_from, date_to, date_after):
+            batches.append(batch)
+            if progress is not None:
+                rows += len(batch)
+                progress(rows, None, None)
+        if batches:
+            df = pd.concat(batches, ignore_index=True)
+        else:
+            df = pd.DataFrame(columns=list(columns or []))
+        if dtype_spec:
+            df = df.astype({c: t for c, t in dtype_spec.items() if c in df.columns})
+        return df
+
+
+def create_mysql_pool(config, pool_name="supplysync_pool", pool_size=5):
+    """Process-wide MySQL connection pool (wrap in st.cache_resource)"""
+    if mysql_pooling is None:
+        raise ImportError("mysql-connector-python is not installed")
+    params = {k: v for k, v in config.items() if k not in ("table", "pool_size", "batch_size")}
+    return mysql_pooling.MySQLConnectionPool(
+        pool_name=pool_name,
+        pool_size=int(config.get("pool_size", pool_size)),
+        **params
+    )
+
+
+def mysql_source(pool, table, **kwargs):
+    """SQLSource backed by a MySQL pool and unbuffered (server-side) cursors"""
+    kwargs.setdefault("cursor_kwargs", {"buffered": False})
+    return SQLSource(pool.get_connection, table, paramstyle="pyformat", **kwargs)
+
+
+def sqlite_source(path, table, **kwargs):
+    """SQLSource over a local SQLite file – same interface, no server needed"""
+    return SQLSource(lambda: sqlite3.connect(path), table, paramstyle="qmark", **kwargs)
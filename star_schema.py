@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+
+# ================================================================
+# STAR-SCHEMA INGESTION (FACT + DIMENSION TABLES)
+# ================================================================
+# Candidate attributes per dimension. An attribute only moves out of the
+# fact table when it is constant for every natural key in the loaded data;
+# anything that varies row-to-row (e.g. a price that changes over time)
+# stays on the fact table.
+DIMENSIONS = {
+    "product": {
+        "key": "product_id",
+        "attributes": [
+            "sku_code", "product_name", "brand", "category", "subcategory",
+            "shelf_life_days", "unit_price", "cost_price", "mrp",
+        ],
+    },
+    "store": {
+        "key": "store_id",
+        "attributes": [
+            "store_name", "store_type", "region", "zone", "city",
+            "store_area_sqft", "operating_hours",
+        ],
+    },
+    "supplier": {
+        "key": "supplier_id",
+        "attributes": [
+            "supplier_name", "supplier_rating", "rating_score", "lead_time_days",
+            "payment_terms", "contract_period_months",
+        ],
+    },
+}
+
+
+def surrogate_column(name):
+    return f"{name}_key"
+
+
+def _dependent_attributes(df, key, candidates):
+    """Candidates that hold exactly one value per natural key"""
+    present = [c for c in candidates if c in df.columns and c != key]
+    if not present:
+        return []
+    counts = df.groupby(key, observed=True, dropna=False)[present].nunique(dropna=False)
+    return [c for c in present if counts.empty or counts[c].max() <= 1]
+
+
+def build_star_schema(df, dimensions=DIMENSIONS):
+    """
+    Split a denormalized frame into a fact table and dimension tables.
+
+    Natural keys and their dependent attributes are replaced on the fact table
+    by an int32 surrogate key (<name>_key) that is the row position in the
+    dimension table. Returns (fact, dims) where dims maps a dimension name to
+    {"key", "surrogate", "table"}.
+    """
+    fact = df
+    dims = {}
+    for name, spec in dimensions.items():
+        key = spec["key"]
+        if key not in fact.columns:
+            continue
+        attributes = _dependent_attributes(fact, key, spec["attributes"])
+
+        codes, _ = pd.factorize(fact[key], use_na_sentinel=False)
+        _, first_rows = np.unique(codes, return_index=True)
+        table = fact.iloc[first_rows][[key] + attributes].reset_index(drop=True)
+
+        surrogate = surrogate_column(name)
+        position = fact.columns.get_loc(key)
+        fact = fact.drop(columns=[key] + attributes)
+        fact.insert(min(position, len(fact.columns)), surrogate, codes.astype(np.int32))
+        dims[name] = {"key": key, "surrogate": surrogate, "table": table}
+    return fact, dims
+
+
+def available_columns(fact, dims=None):
+    """Columns a consumer can ask for: fact columns plus every dimension column"""
+    if not dims:
+        return list(fact.columns)
+    surrogates = {d["surrogate"] for d in dims.values()}
+    cols = [c for c in fact.columns if c not in surrogates]
+    for d in dims.values():
+        cols.extend(d["table"].columns)
+    return cols
+
+
+def join_dimensions(fact, dims, columns=None):
+    """
+    Materialize dimension attributes onto the fact rows.
+
+    columns=None rebuilds the full denormalized frame; otherwise only the listed
+    columns are produced, and dimensions that contribute none of them are never
+    touched. Surrogate keys are dropped from the result.
+    """
+    wanted = None if columns is None else set(columns)
+    surrogates = {d["surrogate"] for d in dims.values()}
+    base = [c for c in fact.columns if c not in surrogates and (wanted is None or c in wanted)]
+
+    joined = []
+    for d in dims.values():
+        if d["surrogate"] not in fact.columns:
+            continue
+        table = d["table"]
+        cols = [c for c in table.columns if wanted is None or c in wanted]
+        if not cols:
+            continue
+        codes = fact[d["surrogate"]].to_numpy()
+        for c in cols:
+            joined.append(pd.Series(table[c].array.take(codes), index=fact.index, name=c))
+
+    out = fact[base]
+    if joined:
+        out = pd.concat([out] + joined, axis=1)
+    return out
+
+
+def _restore_dtypes(frame, reference):
+    """Re-apply reference dtypes after concat (categories are re-inferred)"""
+    fixes = {
+        c: ("category" if isinstance(t, CategoricalDtype) else t)
+        for c, t in reference.dtypes.items()
+        if c in frame.columns and frame[c].dtype != t
+    }
+    return frame.astype(fixes) if fixes else frame
+
+
+def append_to_star(new_rows, dims):
+    """
+    Key newly ingested rows against existing dimension tables.
+
+    Unseen natural keys are appended to their dimension; known keys take the
+    latest attribute values (a one-row update, not a fact-table rewrite).
+    Returns (fact_rows, updated_dims).
+    """
+    fact = new_rows
+    updated = {}
+    for name, d in dims.items():
+        key, table = d["key"], d["table"]
+        if key not in fact.columns:
+            updated[name] = d
+            continue
+        attributes = [c for c in table.columns if c != key and c in fact.columns]
+
+        latest = fact.drop_duplicates(subset=[key], keep="last")[[key] + attributes]
+        positions = pd.Index(table[key]).get_indexer(latest[key])
+        known = positions >= 0
+
+        table = table.copy()
+        if known.any() and attributes:
+            for c in attributes:
+                values = latest.loc[known, c].to_numpy()
+                if isinstance(table[c].dtype, CategoricalDtype):
+                    table[c] = table[c].cat.add_categories(
+                        pd.Index(pd.unique(values)).difference(table[c].cat.categories)
+                    )
+                table.iloc[positions[known], table.columns.get_loc(c)] = values
+        if (~known).any():
+            table = pd.concat([table, latest.loc[~known]], ignore_index=True)
+            table = _restore_dtypes(table, d["table"])
+
+        codes = pd.Index(table[key]).get_indexer(fact[key]).astype(np.int32)
+        position = fact.columns.get_loc(key)
+        fact = fact.drop(columns=[key] + attributes)
+        fact.insert(min(position, len(fact.columns)), d["surrogate"], codes)
+        updated[name] = {"key": key, "surrogate": d["surrogate"], "table": table}
+    return fact, updated
+
+
+def key_column(df, key, dims=None):
+    """Column holding `key` on this frame: the natural key, or its surrogate in star mode"""
+    if key in df.columns:
+        return key
+    for d in (dims or {}).values():
+        if d["key"] == key and d["surrogate"] in df.columns:
+            return d["surrogate"]
+    return None
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+
+# ================================================================
+# PAGINATED TABLE VIEW
+# ================================================================
+# Tables are rendered one page at a time: only the visible rows are sliced
+# out and formatted, column by column, so the HTML cost depends on the page
+# size rather than on the frame. Filtering and sorting work on row positions
+# and only run when a filter or sort is actually requested.
+PAGE_ROWS = 200
+
+HEADER_STYLE = "background:#1F3A5F;color:white;padding:8px 10px;text-align:left;font-weight:600;white-space:nowrap;"
+ROW_STYLE = "border-bottom:1px solid #E5E7EB;"
+CELL_STYLE = "padding:6px 10px;white-space:nowrap;"
+
+
+def _escape(strings):
+    return (strings.str.replace("&", "&amp;", regex=False)
+                   .str.replace("<", "&lt;", regex=False)
+                   .str.replace(">", "&gt;", regex=False))
+
+
+def row_positions(df, query=None, sort_by=None, ascending=True):
+    """
+    Positions of the rows to show, after an optional case-insensitive text
+    filter (any column contains query) and an optional sort. None means
+    "all rows in their current order" (no work done).
+    """
+    positions = None
+    if query:
+        mask = np.zeros(len(df), dtype=bool)
+        for col in df.columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Match each category once, then look the codes up
+                hits = values.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+                codes = values.cat.codes.to_numpy()
+                mask |= (codes >= 0) & np.append(np.asarray(hits, dtype=bool), False)[codes]
+            else:
+                mask |= values.astype(str).str.contains(query, case=False, regex=False, na=False).to_numpy()
+        positions = np.flatnonzero(mask)
+    if sort_by is not None and sort_by in df.columns:
+        column = df[sort_by] if positions is None else df[sort_by].iloc[positions]
+        column = column.reset_index(drop=True)
+        try:
+            order = column.sort_values(ascending=ascending, na_position="last", kind="stable").index
+        except TypeError:
+            # Mixed-type object columns sort by their text
+            order = column.astype(str).sort_values(ascending=ascending, kind="stable").index
+        order = order.to_numpy()
+        positions = order if positions is None else positions[order]
+    return positions
+
+
+def page_count(n_rows, page_rows=PAGE_ROWS):
+    return max(1, -(-n_rows // page_rows))
+
+
+def page_slice(df, page, page_rows=PAGE_ROWS, positions=None):
+    """Rows of page `page` (0-based), without touching any other row"""
+    start = page * page_rows
+    if positions is None:
+        return df.iloc[start:start + page_rows]
+    return df.iloc[positions[start:start + page_rows]]
+
+
+def frame_to_html(df, max_height=300):
+    """Scrollable HTML table; cells are formatted one column at a time"""
+    header = "".join(f'<th style="{HEADER_STYLE}">{c}</th>' for c in df.columns)
+    rows = pd.Series(f"<tr style='{ROW_STYLE}'>", index=range(len(df)), dtype=object)
+    for col in range(df.shape[1]):
+        # str() per value, as an f-string would format it (None / NaN / <NA> included)
+        cells = _escape(pd.Series(list(map(str, df.iloc[:, col].to_numpy(dtype=object))), dtype=object))
+        rows = rows + f"<td style='{CELL_STYLE}'>" + cells + "</td>"
+    body = "".join(rows + "</tr>")
+    return f"""
+        <div style="overflow-x:auto; overflow-y:auto; max-height:{max_height}px;
+                    border:1px solid #D1D5DB; border-radius:8px;">
+        <table style="width:100%; border-collapse:collapse; font-size:13px; background:#fff;">
+            <thead style="position:sticky; top:0; z-index:1;"><tr>{header}</tr></thead>
+            <tbody>{body}</tbody>
+        </table></div>
+        """
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from sql_source import sqlite_source
+
+
+ROWS = [
+    ("2024-01-05", "P1", "S1", 10, 2.5),
+    ("2024-01-20", "P2", "S1", 20, 3.0),
+    ("2024-02-03", "P1", "S2", 30, 1.5),
+    ("2024-02-28", "P3", "S2", 40, 4.0),
+    ("2024-03-10", "P2", "S3", 50, 2.0),
+]
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "fact.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE FACT_SUPPLY_CHAIN_DATA "
+        "(date TEXT, product_id TEXT, store_id TEXT, on_hand_qty INTEGER, fuel_cost REAL)"
+    )
+    conn.executemany("INSERT INTO FACT_SUPPLY_CHAIN_DATA VALUES (?, ?, ?, ?, ?)", ROWS)
+    conn.commit()
+    conn.close()
+    return sqlite_source(path, "FACT_SUPPLY_CHAIN_DATA", batch_size=2)
+
+
+def test_projection_selects_only_requested_columns(source):
+    df = source.read_frame(columns=["date", "on_hand_qty"])
+    assert list(df.columns) == ["date", "on_hand_qty"]
+    assert df["on_hand_qty"].tolist() == [10, 20, 30, 40, 50]
+
+
+def test_date_window_is_half_open(source):
+    df = source.read_frame(date_from="2024-01-20", date_to="2024-02-28")
+    assert df["date"].tolist() == ["2024-01-20", "2024-02-03"]
+
+
+def test_date_after_is_strict(source):
+    df = source.read_frame(date_after="2024-02-03")
+    assert df["date"].tolist() == ["2024-02-28", "2024-03-10"]
+
+
+def test_date_after_combines_with_window(source):
+    df = source.read_frame(date_after="2024-01-05", date_to="2024-03-01")
+    assert df["date"].tolist() == ["2024-01-20", "2024-02-03", "2024-02-28"]
+
+
+def test_batches_respect_batch_size(source):
+    sizes = [len(batch) for batch in source.iter_batches()]
+    assert sizes == [2, 2, 1]
+
+
+def test_progress_reports_running_row_count(source):
+    seen = []
+    source.read_frame(progress=lambda rows, read, total: seen.append(rows))
+    assert seen == [2, 4, 5]
+
+
+def test_dtype_spec_applies_to_present_columns(source):
+    df = source.read_frame(columns=["product_id", "on_hand_qty"],
+                           dtype_spec={"product_id": "category", "region": "category"})
+    assert isinstance(df["product_id"].dtype, pd.CategoricalDtype)
+    assert "region" not in df.columns
+
+
+def test_empty_result_keeps_projected_columns(source):
+    df = source.read_frame(columns=["date", "fuel_cost"], date_from="2030-01-01")
+    assert df.empty
+    assert list(df.columns) == ["date", "fuel_cost"]
+
+
+def test_watermark_is_latest_date(source):
+    assert source.watermark() == "2024-03-10"
+
+
+def test_invalid_identifier_is_rejected(source):
+    with pytest.raises(ValueError):
+        source.read_frame(columns=["date; DROP TABLE x"])
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+from figure_cache import DPI
+
+
+# ================================================================
+# TIME-SERIES DOWNSAMPLING
+# ================================================================
+# A line chart cannot show more points than its plot area has pixels, so long
+# series (daily totals over years of history) are reduced to about one point
+# per horizontal pixel before they are drawn. Largest-Triangle-Three-Buckets
+# keeps the points that carry the visual shape (peaks, dips, turns); min/max
+# keeps each bucket's extremes, which preserves every spike at two points per
+# pixel. Zooming means slicing the full-resolution series to the visible
+# window and downsampling again, so a narrower window shows finer detail.
+LTTB = "lttb"
+MINMAX = "minmax"
+
+
+def plot_width_px(fig_width_in, left=0.0, right=1.0, dpi=DPI):
+    """Horizontal pixels of a matplotlib plot area (figure width × axes fraction × dpi)"""
+    return max(3, int(fig_width_in * (right - left) * dpi))
+
+
+def _positions(index):
+    """Numeric x coordinates of a series index (nanoseconds for dates, row positions otherwise)"""
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype=np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Positions of the n_out points Largest-Triangle-Three-Buckets keeps: the
+    first and last point, plus from each of n_out - 2 equal buckets the point
+    forming the largest triangle with the previously kept point and the mean
+    of the next bucket.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax_indices(y, n_out):
+    """Positions of each bucket's minimum and maximum (n_out // 2 buckets), in order"""
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    keep = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            keep += [lo + int(np.argmin(y[lo:hi])), lo + int(np.argmax(y[lo:hi]))]
+    return np.unique(keep)
+
+
+def downsample(series, n_out, method=LTTB, start=None, end=None):
+    """
+    At most n_out points of a series sorted by its index, restricted to the
+    [start, end] window when given. Missing values are dropped; series that
+    already fit are returned as they are.
+    """
+    if start is not None or end is not None:
+        series = series.loc[start:end]
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+    y = series.to_numpy(dtype=np.float64)
+    if method == LTTB:
+        keep = lttb_indices(_positions(series.index), y, n_out)
+    elif method == MINMAX:
+        keep = minmax_indices(y, n_out)
+    else:
+        raise ValueError(f"Unsupported downsampling method {method!r} (use '{LTTB}' or '{MINMAX}')")
+    return series.iloc[keep]
+
+
+def daily_totals(df, value, date_column="date", agg="sum"):
+    """value aggregated per calendar day, indexed by date (unparseable dates dropped)"""
+    dates = pd.to_datetime(df[date_column], errors="coerce").dt.normalize()
+    return df[value].groupby(dates, sort=True).agg(agg).rename(value).rename_axis(date_column)